@@ -1,19 +1,30 @@
 from __future__ import annotations
 
+import codecs
 import datetime as dt
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from functools import lru_cache
+import hashlib
 import html
+import io
+import os
 import posixpath
 import re
 from pathlib import Path, PurePosixPath
 import shutil
+import struct
 import tempfile
-from typing import Iterable, Optional
+import threading
+import time
+from typing import IO, Iterable, Iterator, Optional, Union
 import zipfile
-import xml.etree.ElementTree as ET
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import zlib
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from lxml import etree as LXML_ET
+from markupsafe import Markup, escape
 
 from .models import Book, Metadata, Volume
 
@@ -60,22 +71,112 @@ class StreamBuildSection:
 
 
 BINDERY_CSS_NAME = "bindery.css"
+BINDERY_CSS_DIGEST_META = "bindery:css-digest"
 CHAPTER_STAMP_RE = re.compile(
     r"^\s*(第[0-9零〇一二两三四五六七八九十百千万亿\d]+章)\s*[:：、.\-·]?\s*(.+)\s*$"
 )
 CONTAINER_NS = "urn:oasis:names:tc:opendocument:xmlns:container"
 OPF_NS = "http://www.idpf.org/2007/opf"
 DC_NS = "http://purl.org/dc/elements/1.1/"
-BINDERY_CSS_BASENAMES = {"bindery.css", "bindery-overlay.css"}
+BINDERY_CSS_BASENAMES = frozenset({"bindery.css", "bindery-overlay.css"})
+DOCUMENT_MEDIA_TYPES = frozenset({"application/xhtml+xml", "text/html"})
+NAV_DOCUMENT_NAMES = frozenset({"nav.xhtml", "nav.html"})
+TEXT_DIR_NAMES = frozenset({"text", "xhtml", "html"})
+ISBN_CHARS = frozenset("0123456789Xx")
+DC_METADATA_LOCALS = frozenset(
+    {"identifier", "title", "language", "creator", "description", "publisher", "date", "subject"}
+)
+DC_TAGS = {local: f"{{{DC_NS}}}{local}" for local in DC_METADATA_LOCALS}
+CLEARED_META_PROPERTIES = frozenset({"dcterms:modified", "belongs-to-collection"})
+OPF_METADATA_TAG = f"{{{OPF_NS}}}metadata"
+OPF_MANIFEST_TAG = f"{{{OPF_NS}}}manifest"
+OPF_SPINE_TAG = f"{{{OPF_NS}}}spine"
+OPF_ITEM_TAG = f"{{{OPF_NS}}}item"
+OPF_META_TAG = f"{{{OPF_NS}}}meta"
+MEDIA_TYPES_BY_SUFFIX = {
+    ".xhtml": "application/xhtml+xml",
+    ".html": "application/xhtml+xml",
+    ".htm": "application/xhtml+xml",
+    ".css": "text/css",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".svg": "image/svg+xml",
+    ".webp": "image/webp",
+    ".ncx": "application/x-dtbncx+xml",
+}
+IMAGE_MEDIA_TYPES_BY_SUFFIX = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+}
+LINK_TAG_START_RE = re.compile(r"<link\b", re.IGNORECASE)
+HREF_ATTR_RE = re.compile(r"\bhref\s*=\s*(['\"])(.*?)\1", re.IGNORECASE | re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s*")
+CONTAINER_FULL_PATH_RE = re.compile(rb"<(?:[\w.-]+:)?rootfile\b[^>]*?\sfull-path\s*=\s*([\"'])([^\"'&<]*)\1")
+STYLESHEET_LINK_RES = (
+    re.compile(r"<link\b[^>]*\brel\s*=\s*['\"][^'\"]*\bstylesheet\b[^'\"]*['\"][^>]*>\s*", re.IGNORECASE),
+    re.compile(r"<link\b[^>]*\brel\s*=\s*stylesheet\b[^>]*>\s*", re.IGNORECASE),
+)
+STYLE_BLOCK_RE = re.compile(r"<style\b[^>]*>.*?</style>\s*", re.IGNORECASE | re.DOTALL)
+XML_STYLESHEET_PI_RE = re.compile(r"<\?xml-stylesheet\b[^>]*\?>\s*", re.IGNORECASE)
+HEAD_OPEN_RE = re.compile(r"<head\b[^>]*>", re.IGNORECASE)
+PREVIEW_TAG_RE = re.compile(rb"<(script|base)\b", re.IGNORECASE)
+SCRIPT_CLOSE_RE = re.compile(rb"</script\s*>", re.IGNORECASE)
+LEADING_SPACE_RE = re.compile(rb"\s*")
+HEAD_OPEN_BYTES_RE = re.compile(rb"<head\b[^>]*>", re.IGNORECASE)
+XML_DECL_ENCODING_RE = re.compile(rb"^\s*<\?xml\b[^>]*?\bencoding\s*=\s*[\"']([\w.:-]+)[\"']")
+META_CHARSET_RE = re.compile(rb"<meta\b[^>]*?\bcharset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+HTML_CHARSET_SNIFF_BYTES = 2048
+HTML_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+TITLE_TAGS = ("title", "h1", "h2")
+TITLE_OPEN_RE = re.compile(r"<(title|h1|h2)\b[^>]*>", re.IGNORECASE)
+TITLE_CLOSE_RES = {tag: re.compile(rf"</{tag}>", re.IGNORECASE) for tag in TITLE_TAGS}
+TAG_RE = re.compile(r"<[^>]+>")
+UNSAFE_MEMBER_CHARS_RE = re.compile(r"[^0-9A-Za-z._-]+")
+HEAD_CLOSE_RE = re.compile(r"</head>", re.IGNORECASE)
+WEBP_SOURCE_RE = re.compile(
+    r"<source\b[^>]*(?:src|srcset)\s*=\s*['\"][^'\"]*\.webp(?:[?#][^'\"]*)?['\"][^>]*>\s*", re.IGNORECASE
+)
+WEBP_IMG_RE = re.compile(r"<img\b[^>]*\bsrc\s*=\s*['\"][^'\"]*\.webp(?:[?#][^'\"]*)?['\"][^>]*>\s*", re.IGNORECASE)
+WEBP_ATTR_RE = re.compile(
+    r"\s+(?:src|href|poster|data-src)\s*=\s*(['\"])[^'\"]*\.webp(?:[?#][^'\"]*)?\1", re.IGNORECASE
+)
+WEBP_SRCSET_RE = re.compile(r"\s+srcset\s*=\s*(['\"])[^'\"]*\.webp[^'\"]*\1", re.IGNORECASE)
+# Already-compressed media gains nothing from deflate.
+PRECOMPRESSED_SUFFIXES = frozenset(
+    {".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp3", ".mp4", ".m4a", ".ogg", ".woff", ".woff2"}
+)
 EPUB_TEMPLATES_DIR = Path(__file__).resolve().parent / "epub_templates"
+PREVIEW_READER_POOL_SIZE = 8
+BUILD_COMPRESS_WORKERS = min(4, os.cpu_count() or 1)
+# TOC walks evaluate these per nav/navPoint node; compile them once.
+NAV_NODES_XPATH = LXML_ET.XPath(".//*[local-name()='nav']")
+NAV_LINKS_XPATH = LXML_ET.XPath(".//*[local-name()='a'][@href]")
+NCX_NAV_POINTS_XPATH = LXML_ET.XPath(".//*[local-name()='navPoint']")
+NCX_LABEL_TEXT_XPATH = LXML_ET.XPath(".//*[local-name()='navLabel']/*[local-name()='text'][1]")
+NCX_CONTENT_XPATH = LXML_ET.XPath(".//*[local-name()='content'][@src][1]")
 
 
 @lru_cache(maxsize=1)
 def _epub_template_env() -> Environment:
     return Environment(
         loader=FileSystemLoader(str(EPUB_TEMPLATES_DIR)),
+        # Template names carry a trailing ".j2", so match on the full double suffix;
+        # escaping is then done by markupsafe's C speedups in one pass per value
+        # (chapter bodies arrive pre-escaped from _paragraphs_markup).
         autoescape=select_autoescape(
-            enabled_extensions=("xml", "xhtml", "html"),
+            enabled_extensions=("xml.j2", "xhtml.j2", "html.j2", "opf.j2", "ncx.j2"),
             default_for_string=False,
         ),
         trim_blocks=True,
@@ -83,10 +184,19 @@ def _epub_template_env() -> Environment:
     )
 
 
+@lru_cache(maxsize=None)
+def _epub_template(template_name: str) -> Template:
+    # Templates ship with the package; resolve each once instead of re-checking
+    # the loader for every rendered section.
+    return _epub_template_env().get_template(template_name)
+
+
 def _render_epub_template(template_name: str, **context: object) -> str:
-    return _epub_template_env().get_template(template_name).render(**context)
+    return _epub_template(template_name).render(**context)
 
 
+# Member names repeat across index builds, rewrites and preview requests for the same book.
+@lru_cache(maxsize=8192)
 def _canonical_zip_member(name: str) -> str:
     normalized = posixpath.normpath((name or "").replace("\\", "/")).lstrip("/")
     while normalized.startswith("../"):
@@ -113,6 +223,155 @@ def _clone_zip_info(
     return cloned
 
 
+ZIPFILE_PRIVATE_NAMES = (
+    "_strip_extra",
+    "_FH_FILENAME_LENGTH",
+    "_FH_EXTRA_FIELD_LENGTH",
+    "sizeFileHeader",
+    "stringFileHeader",
+    "structFileHeader",
+)
+ZIPFILE_PRIVATE_ATTRS = ("_lock", "_seekable", "_writing", "_didModify", "start_dir", "_writecheck")
+
+
+def _zipfile_raw_writes_supported() -> bool:
+    # The raw-copy and parallel-deflate paths poke at zipfile internals; probe them once.
+    if not all(hasattr(zipfile, name) for name in ZIPFILE_PRIVATE_NAMES):
+        return False
+    try:
+        with zipfile.ZipFile(io.BytesIO(), "w") as probe:
+            return all(hasattr(probe, name) for name in ZIPFILE_PRIVATE_ATTRS)
+    except Exception:
+        return False
+
+
+ZIP_RAW_WRITES_SUPPORTED = _zipfile_raw_writes_supported()
+
+
+def _copy_zip_member_raw(
+    src: zipfile.ZipFile,
+    dst: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    target_name: str,
+    chunk_size: int,
+) -> bool:
+    """Copy a member's compressed payload verbatim, skipping inflate/deflate.
+
+    Relies on zipfile internals (the same steps ZipFile.mkdir takes); returns
+    False before touching ``dst`` whenever the entry needs the regular path,
+    including when this Python's zipfile lacks those internals.
+    """
+
+    if not ZIP_RAW_WRITES_SUPPORTED or info.flag_bits & 0x1 or dst._writing:
+        return False
+    zinfo = _clone_zip_info(info, filename=target_name)
+    zinfo.flag_bits &= ~0x08
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    zinfo.extra = zipfile._strip_extra(info.extra, (1,))
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+
+    def payload_chunks() -> Iterator[bytes]:
+        remaining = info.compress_size
+        while remaining > 0:
+            chunk = src.fp.read(min(chunk_size, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated member {info.filename!r}")
+            yield chunk
+            remaining -= len(chunk)
+
+    with src._lock:
+        src.fp.seek(info.header_offset)
+        header = src.fp.read(zipfile.sizeFileHeader)
+        if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+            return False
+        fields = struct.unpack(zipfile.structFileHeader, header)
+        src.fp.seek(fields[zipfile._FH_FILENAME_LENGTH] + fields[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+        _append_raw_zip_member(dst, zinfo, zip64, payload_chunks())
+    return True
+
+
+def _append_raw_zip_member(dst: zipfile.ZipFile, zinfo: zipfile.ZipInfo, zip64: bool, chunks: Iterable[bytes]) -> None:
+    # zinfo must already carry CRC and sizes; chunks are written as the stored payload.
+    with dst._lock:
+        if dst._seekable:
+            dst.fp.seek(dst.start_dir)
+        zinfo.header_offset = dst.fp.tell()
+        dst._writecheck(zinfo)
+        dst._didModify = True
+        dst.fp.write(zinfo.FileHeader(zip64))
+        for chunk in chunks:
+            dst.fp.write(chunk)
+        dst.filelist.append(zinfo)
+        dst.NameToInfo[zinfo.filename] = zinfo
+        dst.start_dir = dst.fp.tell()
+
+
+def _deflate_payload(payload: bytes) -> tuple[bytes, int]:
+    # Same raw deflate stream zipfile produces; zlib drops the GIL while it runs.
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(payload) + compressor.flush(), zlib.crc32(payload)
+
+
+class _OrderedDeflateWriter:
+    """Append members to ``dst`` in call order, deflating payloads on worker threads.
+
+    The caller keeps producing the next payload (rendering or patching a chapter)
+    while earlier ones compress; a short queue bounds memory and preserves order.
+    Anything written to ``dst`` directly must be preceded by :meth:`flush`.
+    """
+
+    def __init__(self, dst: zipfile.ZipFile, workers: int) -> None:
+        self.dst = dst
+        self.limit = workers * 2
+        self.pending: deque[tuple[zipfile.ZipInfo, int, Future[tuple[bytes, int]]]] = deque()
+        parallel = workers > 1 and ZIP_RAW_WRITES_SUPPORTED and dst._seekable
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bindery-deflate") if parallel else None
+
+    def __enter__(self) -> _OrderedDeflateWriter:
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def write(self, zinfo: zipfile.ZipInfo, payload: bytes) -> None:
+        if self.pool is None or zinfo.compress_type != zipfile.ZIP_DEFLATED:
+            self.flush()
+            self.dst.writestr(zinfo, payload)
+            return
+        self.pending.append((zinfo, len(payload), self.pool.submit(_deflate_payload, payload)))
+        if len(self.pending) > self.limit:
+            self._write_next()
+
+    def flush(self) -> None:
+        while self.pending:
+            self._write_next()
+
+    def _write_next(self) -> None:
+        zinfo, file_size, future = self.pending.popleft()
+        deflated, crc = future.result()
+        zinfo.flag_bits &= ~0x08
+        zinfo.extra = zipfile._strip_extra(zinfo.extra, (1,))
+        zinfo.file_size = file_size
+        zinfo.compress_size = len(deflated)
+        zinfo.CRC = crc
+        _append_raw_zip_member(self.dst, zinfo, file_size > zipfile.ZIP64_LIMIT, (deflated,))
+
+
+def _new_zip_info(name: str, compress_type: int = zipfile.ZIP_DEFLATED) -> zipfile.ZipInfo:
+    # What ZipFile.writestr builds for a plain member name.
+    zinfo = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+    zinfo.compress_type = compress_type
+    zinfo.external_attr = 0o600 << 16
+    return zinfo
+
+
 def _copy_zip_member_stream(
     src: zipfile.ZipFile,
     dst: zipfile.ZipFile,
@@ -127,26 +386,80 @@ def _copy_zip_member_stream(
         payload = src.read(info.filename)
         dst.writestr("mimetype", payload, compress_type=zipfile.ZIP_STORED)
         return
+    if compress_type is None or compress_type == info.compress_type:
+        if _copy_zip_member_raw(src, dst, info, target_name, chunk_size):
+            return
     zinfo = _clone_zip_info(info, filename=target_name, compress_type=compress_type)
     with src.open(info.filename, "r") as src_stream:
         with dst.open(zinfo, "w") as dst_stream:
             shutil.copyfileobj(src_stream, dst_stream, chunk_size)
 
 
+def _member_compress_type(name: str) -> int:
+    if posixpath.splitext(name)[1].lower() in PRECOMPRESSED_SUFFIXES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _canonical_zip_infos(
+    infos: list[zipfile.ZipInfo],
+) -> tuple[list[tuple[zipfile.ZipInfo, str]], dict[str, zipfile.ZipInfo]]:
+    pairs = [(info, _canonical_zip_member(info.filename)) for info in infos]
+    info_by_canonical: dict[str, zipfile.ZipInfo] = {}
+    for info, canonical in pairs:
+        info_by_canonical.setdefault(canonical, info)
+    return pairs, info_by_canonical
+
+
+def _write_zip_payload(dst: zipfile.ZipFile, zinfo: zipfile.ZipInfo, payload: Union[bytes, Path]) -> None:
+    if isinstance(payload, Path):
+        with payload.open("rb") as src_stream:
+            with dst.open(zinfo, "w", force_zip64=True) as dst_stream:
+                shutil.copyfileobj(src_stream, dst_stream, 1024 * 1024)
+        return
+    dst.writestr(zinfo, payload)
+
+
+def _has_noncanonical_members(zf: zipfile.ZipFile) -> bool:
+    return any(_canonical_zip_member(info.filename) != info.filename for info in zf.infolist())
+
+
+@contextmanager
+def _atomic_epub_write(epub_file: Path) -> Iterator[Path]:
+    """Yield a sibling temp path that replaces ``epub_file`` only if the block succeeds."""
+
+    tmp_handle = tempfile.NamedTemporaryFile(
+        prefix=f"{epub_file.stem}.",
+        suffix=".epub",
+        dir=str(epub_file.parent),
+        delete=False,
+    )
+    tmp_path = Path(tmp_handle.name)
+    tmp_handle.close()
+    try:
+        yield tmp_path
+        tmp_path.replace(epub_file)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def _normalize_epub_archive_paths(epub_file: Path, expected_missing: str = "") -> bool:
     if not epub_file.exists():
         return False
     expected = _canonical_zip_member(expected_missing)
-    expected_name = PurePosixPath(expected).name if expected else ""
+    expected_name = expected.rpartition("/")[2]
     canonical_map: list[tuple[zipfile.ZipInfo, str]] = []
     with zipfile.ZipFile(epub_file, "r") as src:
         infos = src.infolist()
+        if not expected and not _has_noncanonical_members(src):
+            return False
         needs_rewrite = False
         for info in infos:
             original = (info.filename or "").replace("\\", "/")
             canonical = _canonical_zip_member(original)
-            if expected and ".." in PurePosixPath(original).parts:
-                if PurePosixPath(canonical).name == expected_name:
+            if expected and ".." in original.split("/"):
+                if canonical.rpartition("/")[2] == expected_name:
                     canonical = expected
             if canonical != info.filename:
                 needs_rewrite = True
@@ -154,17 +467,8 @@ def _normalize_epub_archive_paths(epub_file: Path, expected_missing: str = "") -
         if not needs_rewrite:
             return False
 
-        tmp_handle = tempfile.NamedTemporaryFile(
-            prefix=f"{epub_file.stem}.",
-            suffix=".epub",
-            dir=str(epub_file.parent),
-            delete=False,
-        )
-        tmp_path = Path(tmp_handle.name)
-        tmp_handle.close()
-
         written: set[str] = set()
-        try:
+        with _atomic_epub_write(epub_file) as tmp_path:
             with zipfile.ZipFile(tmp_path, "w") as dst:
                 # EPUB 规范要求 mimetype 为第一个且不压缩。
                 for info, canonical in canonical_map:
@@ -179,11 +483,7 @@ def _normalize_epub_archive_paths(epub_file: Path, expected_missing: str = "") -
                     _copy_zip_member_stream(src, dst, info, output_name=canonical)
                     written.add(canonical)
 
-            tmp_path.replace(epub_file)
-            return True
-        finally:
-            if tmp_path.exists():
-                tmp_path.unlink(missing_ok=True)
+        return True
 
 
 def _tag_local_name(tag: object) -> str:
@@ -194,7 +494,7 @@ def _tag_local_name(tag: object) -> str:
     return tag
 
 
-def _find_first_child_by_local_name(node: ET.Element, local_name: str) -> Optional[ET.Element]:
+def _find_first_child_by_local_name(node: LXML_ET._Element, local_name: str) -> Optional[LXML_ET._Element]:
     for child in list(node):
         if _tag_local_name(child.tag) == local_name:
             return child
@@ -202,19 +502,34 @@ def _find_first_child_by_local_name(node: ET.Element, local_name: str) -> Option
 
 
 def _resolve_opf_href(opf_path: str, href: str) -> str:
-    opf_dir = PurePosixPath(opf_path).parent
-    joined = posixpath.normpath(posixpath.join(opf_dir.as_posix(), href))
-    return _canonical_zip_member(joined)
+    # Runs once per manifest item; _canonical_zip_member already normalises the joined path.
+    opf_dir = opf_path.rpartition("/")[0]
+    return _canonical_zip_member(posixpath.join(opf_dir, href) if opf_dir else href)
 
 
 def _relative_href(from_member: str, to_member: str) -> str:
-    from_dir = PurePosixPath(from_member).parent.as_posix()
-    start = from_dir if from_dir not in {"", "."} else "."
-    return posixpath.relpath(to_member, start=start)
+    from_dir = from_member.rpartition("/")[0]
+    return posixpath.relpath(to_member, start=from_dir or ".")
 
 
-def _zip_member_index(zf: zipfile.ZipFile) -> dict[str, str]:
-    mapping: dict[str, str] = {}
+class _ZipMemberIndex(dict[str, str]):
+    """Canonical member path -> archive name, with a lazily built basename index."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._by_basename: Optional[dict[str, list[tuple[str, str]]]] = None
+
+    def basename_matches(self, basename: str) -> list[tuple[str, str]]:
+        if self._by_basename is None:
+            grouped: dict[str, list[tuple[str, str]]] = {}
+            for key, actual in self.items():
+                grouped.setdefault(key.rpartition("/")[2], []).append((key, actual))
+            self._by_basename = grouped
+        return self._by_basename.get(basename, [])
+
+
+def _zip_member_index(zf: zipfile.ZipFile) -> _ZipMemberIndex:
+    mapping = _ZipMemberIndex()
     for info in zf.infolist():
         canonical = _canonical_zip_member(info.filename)
         if canonical and canonical not in mapping:
@@ -222,10 +537,14 @@ def _zip_member_index(zf: zipfile.ZipFile) -> dict[str, str]:
     return mapping
 
 
-def _locate_zip_member(index: dict[str, str], member_path: str) -> Optional[tuple[str, str]]:
+def _locate_zip_member(index: _ZipMemberIndex, member_path: str) -> Optional[tuple[str, str]]:
     canonical = _canonical_zip_member(member_path)
     if not canonical:
         return None
+    # Exact hits are the norm and are the first lookup key anyway; skip building the rest.
+    actual = index.get(canonical)
+    if actual is not None:
+        return canonical, actual
     for candidate in _path_lookup_keys(canonical):
         if candidate in index:
             return candidate, index[candidate]
@@ -233,13 +552,9 @@ def _locate_zip_member(index: dict[str, str], member_path: str) -> Optional[tupl
     for candidate in _path_lookup_keys(normalized):
         if candidate in index:
             return candidate, index[candidate]
-    basename = PurePosixPath(canonical).name
+    basename = canonical.rpartition("/")[2]
     if basename:
-        basename_matches = [
-            (key, actual)
-            for key, actual in index.items()
-            if PurePosixPath(key).name == basename
-        ]
+        basename_matches = index.basename_matches(basename)
         if len(basename_matches) == 1:
             return basename_matches[0]
         if len(basename_matches) > 1:
@@ -256,7 +571,7 @@ def _locate_zip_member(index: dict[str, str], member_path: str) -> Optional[tupl
     return None
 
 
-def _read_member_bytes(zf: zipfile.ZipFile, index: dict[str, str], member_path: str) -> Optional[bytes]:
+def _read_member_bytes(zf: zipfile.ZipFile, index: _ZipMemberIndex, member_path: str) -> Optional[bytes]:
     located = _locate_zip_member(index, member_path)
     if not located:
         return None
@@ -269,16 +584,74 @@ def _xml_root_from_bytes(raw: bytes) -> LXML_ET._Element:
     return LXML_ET.fromstring(raw, parser=parser)
 
 
-def _opf_root_from_zip(
-    zf: zipfile.ZipFile, index: dict[str, str]
-) -> tuple[str, LXML_ET._Element]:
+def _xml_root_for_rewrite(raw: bytes) -> LXML_ET._Element:
+    # Strict parse: a document we cannot read cleanly must not be rewritten.
+    parser = LXML_ET.XMLParser(resolve_entities=False, no_network=True)
+    return LXML_ET.fromstring(raw, parser=parser)
+
+
+def _xml_document_bytes(root: LXML_ET._Element) -> bytes:
+    return LXML_ET.tostring(root.getroottree(), encoding="utf-8", xml_declaration=True)
+
+
+def _read_exact_member(zf: zipfile.ZipFile, member_path: str) -> Optional[bytes]:
+    try:
+        return zf.read(member_path)
+    except KeyError:
+        return None
+
+
+def _opf_bytes_from_zip(zf: zipfile.ZipFile, index: Optional[_ZipMemberIndex] = None) -> tuple[str, bytes]:
     opf_path = _opf_path_from_container(zf)
-    opf_raw = _read_member_bytes(zf, index, opf_path)
+    # Well-formed archives store the OPF under its canonical name; only build the
+    # full member index when the direct lookup misses.
+    opf_raw = _read_exact_member(zf, opf_path)
+    if opf_raw is None:
+        opf_raw = _read_member_bytes(zf, index if index is not None else _zip_member_index(zf), opf_path)
     if opf_raw is None:
         raise FileNotFoundError(opf_path)
+    return opf_path, opf_raw
+
+
+def _opf_root_from_zip(
+    zf: zipfile.ZipFile, index: Optional[_ZipMemberIndex] = None
+) -> tuple[str, LXML_ET._Element]:
+    opf_path, opf_raw = _opf_bytes_from_zip(zf, index)
     return opf_path, _xml_root_from_bytes(opf_raw)
 
 
+def _opf_metadata_from_stream(stream: IO[bytes]) -> Optional[LXML_ET._Element]:
+    # <metadata> precedes <manifest>/<spine>, so stop parsing as soon as it closes
+    # instead of building the whole (possibly very large) package tree.
+    events = LXML_ET.iterparse(
+        stream,
+        events=("end",),
+        tag="{*}metadata",
+        resolve_entities=False,
+        no_network=True,
+        recover=True,
+    )
+    try:
+        for _, node in events:
+            parent = node.getparent()
+            if parent is not None and parent.getparent() is None:
+                return node
+    except LXML_ET.XMLSyntaxError:
+        pass
+    return None
+
+
+def _opf_metadata_from_bytes(opf_raw: bytes) -> Optional[LXML_ET._Element]:
+    metadata = _opf_metadata_from_stream(io.BytesIO(opf_raw))
+    if metadata is not None:
+        return metadata
+    root = _xml_root_from_bytes(opf_raw)
+    metadata = root.find(OPF_METADATA_TAG)
+    if metadata is None:
+        metadata = _child_by_local_name(root, "metadata")
+    return metadata
+
+
 def _child_by_local_name(node: LXML_ET._Element, local_name: str) -> Optional[LXML_ET._Element]:
     for child in list(node):
         if _tag_local_name(child.tag) == local_name:
@@ -292,27 +665,30 @@ def _iter_children_by_local_name(node: LXML_ET._Element, local_name: str) -> lis
 
 def _is_document_media_type(media_type: str) -> bool:
     normalized = (media_type or "").strip().lower()
-    return normalized in {"application/xhtml+xml", "text/html"}
+    return normalized in DOCUMENT_MEDIA_TYPES
 
 
 def _is_nav_manifest_item(item: _ZipManifestItem) -> bool:
     if "nav" in item.properties:
         return True
-    name = Path(item.member_path).name.lower()
-    return name in {"nav.xhtml", "nav.html"}
+    return item.member_path.rpartition("/")[2].lower() in NAV_DOCUMENT_NAMES
+
+
+def _is_spine_document(item: _ZipManifestItem) -> bool:
+    # Manifest media types are stripped and lower-cased when the OPF is parsed.
+    return item.media_type in DOCUMENT_MEDIA_TYPES and not _is_nav_manifest_item(item)
 
 
 def _resolve_member_relative(from_member: str, href: str) -> str:
     raw = (href or "").split("#", 1)[0].strip()
     if not raw:
         return ""
-    from_dir = PurePosixPath(from_member).parent.as_posix()
-    base = from_dir if from_dir not in {"", "."} else "."
+    base = from_member.rpartition("/")[0] or "."
     return _canonical_zip_member(posixpath.normpath(posixpath.join(base, raw)))
 
 
 def _manifest_from_opf(opf_path: str, root: LXML_ET._Element) -> tuple[list[_ZipManifestItem], dict[str, _ZipManifestItem]]:
-    manifest = root.find(f"{{{OPF_NS}}}manifest")
+    manifest = root.find(OPF_MANIFEST_TAG)
     if manifest is None:
         manifest = _child_by_local_name(root, "manifest")
     if manifest is None:
@@ -338,7 +714,7 @@ def _manifest_from_opf(opf_path: str, root: LXML_ET._Element) -> tuple[list[_Zip
 def _spine_document_items(
     root: LXML_ET._Element, manifest_items: list[_ZipManifestItem], items_by_id: dict[str, _ZipManifestItem]
 ) -> list[_ZipManifestItem]:
-    spine = root.find(f"{{{OPF_NS}}}spine")
+    spine = root.find(OPF_SPINE_TAG)
     if spine is None:
         spine = _child_by_local_name(root, "spine")
 
@@ -349,20 +725,11 @@ def _spine_document_items(
             if not idref:
                 continue
             item = items_by_id.get(idref)
-            if not item or not _is_document_media_type(item.media_type):
-                continue
-            if _is_nav_manifest_item(item):
-                continue
-            docs.append(item)
+            if item is not None and _is_spine_document(item):
+                docs.append(item)
     if docs:
         return docs
-    for item in manifest_items:
-        if not _is_document_media_type(item.media_type):
-            continue
-        if _is_nav_manifest_item(item):
-            continue
-        docs.append(item)
-    return docs
+    return [item for item in manifest_items if _is_spine_document(item)]
 
 
 def _node_text(node: Optional[LXML_ET._Element]) -> Optional[str]:
@@ -373,7 +740,7 @@ def _node_text(node: Optional[LXML_ET._Element]) -> Optional[str]:
 
 
 def _nav_toc_title_index(
-    zf: zipfile.ZipFile, index: dict[str, str], manifest_items: list[_ZipManifestItem]
+    zf: zipfile.ZipFile, index: _ZipMemberIndex, manifest_items: list[_ZipManifestItem]
 ) -> dict[str, str]:
     mapping: dict[str, str] = {}
     nav_items = [item for item in manifest_items if _is_document_media_type(item.media_type) and _is_nav_manifest_item(item)]
@@ -385,7 +752,7 @@ def _nav_toc_title_index(
             root = _xml_root_from_bytes(nav_raw)
         except Exception:
             continue
-        nav_nodes = root.xpath(".//*[local-name()='nav']")  # noqa: S320
+        nav_nodes = NAV_NODES_XPATH(root)
         scoped_links: list[LXML_ET._Element] = []
         for nav in nav_nodes:
             nav_type = ""
@@ -395,9 +762,9 @@ def _nav_toc_title_index(
                     break
             if nav_type and nav_type != "toc":
                 continue
-            scoped_links.extend(nav.xpath(".//*[local-name()='a'][@href]"))  # noqa: S320
+            scoped_links.extend(NAV_LINKS_XPATH(nav))
         if not scoped_links:
-            scoped_links = root.xpath(".//*[local-name()='a'][@href]")  # noqa: S320
+            scoped_links = NAV_LINKS_XPATH(root)
         for link in scoped_links:
             href = str(link.attrib.get("href") or "").strip()
             if not href:
@@ -414,7 +781,7 @@ def _nav_toc_title_index(
 
 
 def _ncx_toc_title_index(
-    zf: zipfile.ZipFile, index: dict[str, str], manifest_items: list[_ZipManifestItem]
+    zf: zipfile.ZipFile, index: _ZipMemberIndex, manifest_items: list[_ZipManifestItem]
 ) -> dict[str, str]:
     mapping: dict[str, str] = {}
     ncx_items = [
@@ -430,10 +797,9 @@ def _ncx_toc_title_index(
             root = _xml_root_from_bytes(ncx_raw)
         except Exception:
             continue
-        nav_points = root.xpath(".//*[local-name()='navPoint']")  # noqa: S320
-        for point in nav_points:
-            label = point.xpath(".//*[local-name()='navLabel']/*[local-name()='text'][1]")  # noqa: S320
-            content_nodes = point.xpath(".//*[local-name()='content'][@src][1]")  # noqa: S320
+        for point in NCX_NAV_POINTS_XPATH(root):
+            label = NCX_LABEL_TEXT_XPATH(point)
+            content_nodes = NCX_CONTENT_XPATH(point)
             if not label or not content_nodes:
                 continue
             title = _node_text(label[0])
@@ -449,7 +815,7 @@ def _ncx_toc_title_index(
 
 
 def _toc_title_index_from_zip(
-    zf: zipfile.ZipFile, index: dict[str, str], manifest_items: list[_ZipManifestItem]
+    zf: zipfile.ZipFile, index: _ZipMemberIndex, manifest_items: list[_ZipManifestItem]
 ) -> dict[str, str]:
     mapping = _nav_toc_title_index(zf, index, manifest_items)
     for key, value in _ncx_toc_title_index(zf, index, manifest_items).items():
@@ -459,7 +825,7 @@ def _toc_title_index_from_zip(
 
 def _resolve_document_title(
     zf: zipfile.ZipFile,
-    index: dict[str, str],
+    index: _ZipMemberIndex,
     item: _ZipManifestItem,
     toc_titles: dict[str, str],
     fallback_index: int,
@@ -475,72 +841,79 @@ def _resolve_document_title(
         if payload:
             title = _extract_title_from_html(payload.decode("utf-8", errors="replace"))
     if not title:
-        name = item.href or item.member_path or "section"
-        title = Path(name).stem
+        title = _member_stem(item.href or item.member_path or "section")
     return title or f"章节 {fallback_index + 1}"
 
 
+def _member_stem(name: str) -> str:
+    # Path(name).stem without building a Path for every spine item.
+    base = name.rstrip("/").rpartition("/")[2]
+    dot = base.rfind(".")
+    return base[:dot] if 0 < dot < len(base) - 1 else base
+
+
 def _guess_media_type(member_path: str) -> str:
-    suffix = Path(member_path).suffix.lower()
-    if suffix in {".xhtml", ".html", ".htm"}:
-        return "application/xhtml+xml"
-    if suffix == ".css":
-        return "text/css"
-    if suffix in {".jpg", ".jpeg"}:
-        return "image/jpeg"
-    if suffix == ".png":
-        return "image/png"
-    if suffix == ".gif":
-        return "image/gif"
-    if suffix == ".svg":
-        return "image/svg+xml"
-    if suffix == ".webp":
-        return "image/webp"
-    if suffix == ".ncx":
-        return "application/x-dtbncx+xml"
-    return "application/octet-stream"
+    suffix = posixpath.splitext(member_path)[1].lower()
+    return MEDIA_TYPES_BY_SUFFIX.get(suffix, "application/octet-stream")
 
 
 def _derive_package_root_from_docs(doc_members: list[str]) -> PurePosixPath:
     if not doc_members:
         return PurePosixPath(".")
-    doc_dirs = [PurePosixPath(member).parent.as_posix() for member in doc_members]
+    # Chapters nearly always share a directory, so commonpath sees one or two entries.
+    doc_dirs = {member.rpartition("/")[0] or "." for member in doc_members}
     common = posixpath.commonpath(doc_dirs) or "."
     root = PurePosixPath(common)
     if root.as_posix() in {"", "."}:
         return PurePosixPath(".")
-    if root.parts and root.parts[-1].lower() in {"text", "xhtml", "html"}:
+    if root.parts and root.parts[-1].lower() in TEXT_DIR_NAMES:
         parent = root.parent.as_posix()
         return PurePosixPath(".") if parent in {"", "."} else root.parent
     return root
 
 
+def _is_bindery_css_href(href: str) -> bool:
+    path = href.split("#", 1)[0].split("?", 1)[0]
+    return path.rsplit("/", 1)[-1].strip().lower() in BINDERY_CSS_BASENAMES
+
+
 def _strip_bindery_css_links(html_text: str) -> str:
-    return re.sub(
-        r"<link\b[^>]*href=['\"][^'\"]*bindery(?:-overlay)?\.css[^'\"]*['\"][^>]*>\s*",
-        "",
-        html_text,
-        flags=re.IGNORECASE,
-    )
+    # Single left-to-right scan over <link ...> tags; an unclosed tag ends the scan
+    # instead of being retried from every later "<link" like a backtracking regex.
+    pieces: list[str] = []
+    kept_from = 0
+    search_from = 0
+    while True:
+        start = LINK_TAG_START_RE.search(html_text, search_from)
+        if start is None:
+            break
+        end = html_text.find(">", start.end())
+        if end == -1:
+            break
+        href = HREF_ATTR_RE.search(html_text, start.end(), end)
+        if href and _is_bindery_css_href(href.group(2)):
+            pieces.append(html_text[kept_from : start.start()])
+            kept_from = WHITESPACE_RE.match(html_text, end + 1).end()
+        search_from = end + 1
+    if not pieces:
+        return html_text
+    pieces.append(html_text[kept_from:])
+    return "".join(pieces)
 
 
 def _strip_stylesheet_links(html_text: str) -> str:
-    patterns = [
-        r"<link\b[^>]*\brel\s*=\s*['\"][^'\"]*\bstylesheet\b[^'\"]*['\"][^>]*>\s*",
-        r"<link\b[^>]*\brel\s*=\s*stylesheet\b[^>]*>\s*",
-    ]
     text = html_text
-    for pattern in patterns:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE)
+    for pattern in STYLESHEET_LINK_RES:
+        text = pattern.sub("", text)
     return text
 
 
 def _strip_inline_style_blocks(html_text: str) -> str:
-    return re.sub(r"<style\b[^>]*>.*?</style>\s*", "", html_text, flags=re.IGNORECASE | re.DOTALL)
+    return STYLE_BLOCK_RE.sub("", html_text)
 
 
 def _strip_xml_stylesheet_pi(html_text: str) -> str:
-    return re.sub(r"<\?xml-stylesheet\b[^>]*\?>\s*", "", html_text, flags=re.IGNORECASE)
+    return XML_STYLESHEET_PI_RE.sub("", html_text)
 
 
 def _strip_all_css_html(html_text: str) -> str:
@@ -550,19 +923,24 @@ def _strip_all_css_html(html_text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=256)
+def _stylesheet_link_tag(href: str) -> str:
+    # Chapters in one directory share the relative href, so the tag repeats.
+    return f'<link rel="stylesheet" type="text/css" href="{html.escape(href, quote=True)}" />'
+
+
 def _append_stylesheet_link(html_text: str, href: str) -> str:
-    safe_href = html.escape(href, quote=True)
-    link_tag = f'<link rel="stylesheet" type="text/css" href="{safe_href}" />'
-    self_close = re.search(r"<head([^>]*)\s*/>", html_text, flags=re.IGNORECASE)
-    if self_close:
-        attrs = self_close.group(1) or ""
-        replacement = f"<head{attrs}>{link_tag}</head>"
-        return re.sub(r"<head([^>]*)\s*/>", replacement, html_text, count=1, flags=re.IGNORECASE)
-    closing = re.search(r"</head>", html_text, flags=re.IGNORECASE)
+    link_tag = _stylesheet_link_tag(href)
+    # Any <head/> is also a HEAD_OPEN_RE match, so checking the first opener avoids
+    # sweeping the whole chapter for a self-closing head that is almost never there.
+    opening = HEAD_OPEN_RE.search(html_text)
+    if opening and html_text[opening.end() - 2 : opening.end()] == "/>":
+        attrs = html_text[opening.start() + 5 : opening.end() - 2]
+        return f"{html_text[:opening.start()]}<head{attrs}>{link_tag}</head>{html_text[opening.end():]}"
+    closing = HEAD_CLOSE_RE.search(html_text)
     if closing:
         idx = closing.start()
         return f"{html_text[:idx]}{link_tag}{html_text[idx:]}"
-    opening = re.search(r"<head[^>]*>", html_text, flags=re.IGNORECASE)
     if opening:
         idx = opening.end()
         return f"{html_text[:idx]}{link_tag}{html_text[idx:]}"
@@ -579,7 +957,7 @@ def _patch_doc_html_bindery_css(html_text: str, href: Optional[str], *, strip_or
     return _append_stylesheet_link(stripped, href)
 
 
-def _is_webp_manifest_item(item: ET.Element) -> bool:
+def _is_webp_manifest_item(item: LXML_ET._Element) -> bool:
     href = str(item.attrib.get("href") or "").strip().lower()
     media_type = str(item.attrib.get("media-type") or "").strip().lower()
     return href.endswith(".webp") or media_type == "image/webp"
@@ -587,30 +965,10 @@ def _is_webp_manifest_item(item: ET.Element) -> bool:
 
 def _strip_webp_refs_from_html(html_text: str) -> str:
     # Remove common webp-only media nodes and attributes in XHTML/HTML chapters.
-    text = re.sub(
-        r"<source\b[^>]*(?:src|srcset)\s*=\s*['\"][^'\"]*\.webp(?:[?#][^'\"]*)?['\"][^>]*>\s*",
-        "",
-        html_text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r"<img\b[^>]*\bsrc\s*=\s*['\"][^'\"]*\.webp(?:[?#][^'\"]*)?['\"][^>]*>\s*",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r"\s+(?:src|href|poster|data-src)\s*=\s*(['\"])[^'\"]*\.webp(?:[?#][^'\"]*)?\1",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r"\s+srcset\s*=\s*(['\"])[^'\"]*\.webp[^'\"]*\1",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
+    text = WEBP_SOURCE_RE.sub("", html_text)
+    text = WEBP_IMG_RE.sub("", text)
+    text = WEBP_ATTR_RE.sub("", text)
+    text = WEBP_SRCSET_RE.sub("", text)
     return text
 
 
@@ -619,18 +977,18 @@ def strip_webp_assets_and_refs(epub_file: Path) -> bool:
         return False
 
     with zipfile.ZipFile(epub_file, "r") as src:
-        infos = src.infolist()
+        canonical_infos, info_by_canonical = _canonical_zip_infos(src.infolist())
         try:
             opf_path = _opf_path_from_container(src)
         except Exception:
             return False
 
-        opf_info = next((info for info in infos if _canonical_zip_member(info.filename) == opf_path), None)
+        opf_info = info_by_canonical.get(opf_path)
         if opf_info is None:
             return False
 
-        root = ET.fromstring(src.read(opf_info.filename))
-        manifest = root.find(f"{{{OPF_NS}}}manifest")
+        root = _xml_root_for_rewrite(src.read(opf_info.filename))
+        manifest = root.find(OPF_MANIFEST_TAG)
         if manifest is None:
             manifest = _find_first_child_by_local_name(root, "manifest")
         if manifest is None:
@@ -643,7 +1001,7 @@ def strip_webp_assets_and_refs(epub_file: Path) -> bool:
         for item in manifest_items:
             href = str(item.attrib.get("href") or "").strip()
             media_type = str(item.attrib.get("media-type") or "").strip().lower()
-            if href and media_type in {"application/xhtml+xml", "text/html"}:
+            if href and media_type in DOCUMENT_MEDIA_TYPES:
                 member = _resolve_opf_href(opf_path, href)
                 if member:
                     doc_members.append(member)
@@ -659,29 +1017,19 @@ def strip_webp_assets_and_refs(epub_file: Path) -> bool:
         if not remove_members:
             return False
 
-        opf_replacement = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        opf_replacement = _xml_document_bytes(root)
         doc_member_set = set(doc_members)
-        tmp_handle = tempfile.NamedTemporaryFile(
-            prefix=f"{epub_file.stem}.",
-            suffix=".epub",
-            dir=str(epub_file.parent),
-            delete=False,
-        )
-        tmp_path = Path(tmp_handle.name)
-        tmp_handle.close()
-
         written: set[str] = set()
-        try:
+        with _atomic_epub_write(epub_file) as tmp_path:
             with zipfile.ZipFile(tmp_path, "w") as dst:
-                for info in infos:
-                    canonical = _canonical_zip_member(info.filename)
-                    if canonical != "mimetype" or canonical in written:
-                        continue
-                    _copy_zip_member_stream(src, dst, info, output_name="mimetype", compress_type=zipfile.ZIP_STORED)
-                    written.add(canonical)
-
-                for info in infos:
-                    canonical = _canonical_zip_member(info.filename)
+                mimetype_info = info_by_canonical.get("mimetype")
+                if mimetype_info is not None:
+                    _copy_zip_member_stream(
+                        src, dst, mimetype_info, output_name="mimetype", compress_type=zipfile.ZIP_STORED
+                    )
+                    written.add("mimetype")
+
+                for info, canonical in canonical_infos:
                     if not canonical or canonical in written:
                         continue
                     if canonical in remove_members:
@@ -713,24 +1061,15 @@ def strip_webp_assets_and_refs(epub_file: Path) -> bool:
                     dst.writestr(zinfo, opf_replacement)
                     written.add(opf_path)
 
-            tmp_path.replace(epub_file)
+        # Copies keep the source names, so only reopen when some were non-canonical.
+        if _has_noncanonical_members(src):
             _normalize_epub_archive_paths(epub_file)
-            return True
-        finally:
-            if tmp_path.exists():
-                tmp_path.unlink(missing_ok=True)
+        return True
 
 
 def _guess_image_media_type(name: str) -> str:
-    suffix = Path(name).suffix.lower()
-    return {
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-        ".svg": "image/svg+xml",
-    }.get(suffix, "image/jpeg")
+    suffix = posixpath.splitext(name)[1].lower()
+    return IMAGE_MEDIA_TYPES_BY_SUFFIX.get(suffix, "image/jpeg")
 
 
 def _opf_path_from_container(zf: zipfile.ZipFile) -> str:
@@ -738,7 +1077,16 @@ def _opf_path_from_container(zf: zipfile.ZipFile) -> str:
         container_raw = zf.read("META-INF/container.xml")
     except KeyError as exc:
         raise KeyError("Missing META-INF/container.xml") from exc
-    root = ET.fromstring(container_raw)
+    # container.xml is a few hundred bytes; only fall back to a parser for unusual encodings.
+    match = CONTAINER_FULL_PATH_RE.search(container_raw)
+    if match:
+        try:
+            normalized = _canonical_zip_member(match.group(2).decode("utf-8").strip())
+        except UnicodeDecodeError:
+            normalized = ""
+        if normalized:
+            return normalized
+    root = _xml_root_for_rewrite(container_raw)
     rootfile = root.find(f".//{{{CONTAINER_NS}}}rootfile")
     full_path = ""
     if rootfile is not None:
@@ -757,82 +1105,119 @@ def _opf_path_from_container(zf: zipfile.ZipFile) -> str:
     return normalized
 
 
+def _clear_opf_metadata(metadata_node: LXML_ET._Element, *, drop_cover: bool) -> None:
+    kept: list[LXML_ET._Element] = []
+    for child in metadata_node:
+        local = _tag_local_name(child.tag)
+        if local in DC_METADATA_LOCALS:
+            continue
+        if local == "meta":
+            if str(child.attrib.get("property") or "").strip() in CLEARED_META_PROPERTIES:
+                continue
+            name = str(child.attrib.get("name") or "").strip()
+            if name == "rating" or (drop_cover and name == "cover"):
+                continue
+        kept.append(child)
+    # Only rebuild the child list when something was actually dropped.
+    if len(kept) != len(metadata_node):
+        metadata_node[:] = kept
+
+
+def _ensure_opf_metadata_node(root: LXML_ET._Element) -> LXML_ET._Element:
+    metadata_node = root.find(OPF_METADATA_TAG)
+    if metadata_node is None:
+        metadata_node = _find_first_child_by_local_name(root, "metadata")
+    if metadata_node is None:
+        metadata_node = LXML_ET.Element(OPF_METADATA_TAG)
+        root.insert(0, metadata_node)
+    return metadata_node
+
+
+def _css_digest(css_clean: str) -> str:
+    return hashlib.sha1(css_clean.encode("utf-8")).hexdigest()
+
+
+def _set_bindery_css_digest(root: LXML_ET._Element, digest: Optional[str]) -> None:
+    metadata_node = _ensure_opf_metadata_node(root)
+    for child in _iter_children_by_local_name(metadata_node, "meta"):
+        if str(child.attrib.get("name") or "").strip() == BINDERY_CSS_DIGEST_META:
+            metadata_node.remove(child)
+    if digest:
+        digest_el = LXML_ET.SubElement(metadata_node, OPF_META_TAG)
+        digest_el.set("name", BINDERY_CSS_DIGEST_META)
+        digest_el.set("content", digest)
+
+
+def _epub_bindery_css_digest(epub_file: Path) -> Optional[str]:
+    try:
+        with zipfile.ZipFile(epub_file, "r") as zf:
+            _, opf_raw = _opf_bytes_from_zip(zf)
+    except Exception:
+        return None
+    metadata = _opf_metadata_from_bytes(opf_raw)
+    if metadata is None:
+        return None
+    for node in _iter_children_by_local_name(metadata, "meta"):
+        if str(node.attrib.get("name") or "").strip() == BINDERY_CSS_DIGEST_META:
+            return str(node.attrib.get("content") or "").strip() or None
+    return None
+
+
 def _apply_metadata_to_opf_root(
-    root: ET.Element,
+    root: LXML_ET._Element,
     meta: Metadata,
     *,
     keep_cover: bool,
     cover_meta_id: Optional[str] = None,
 ) -> None:
-    metadata_node = root.find(f"{{{OPF_NS}}}metadata")
-    if metadata_node is None:
-        metadata_node = _find_first_child_by_local_name(root, "metadata")
-    if metadata_node is None:
-        metadata_node = ET.Element(f"{{{OPF_NS}}}metadata")
-        root.insert(0, metadata_node)
+    metadata_node = _ensure_opf_metadata_node(root)
 
-    dc_locals_to_clear = {"identifier", "title", "language", "creator", "description", "publisher", "date", "subject"}
-    for child in list(metadata_node):
-        local = _tag_local_name(child.tag)
-        if local in dc_locals_to_clear:
-            metadata_node.remove(child)
-            continue
-        if local != "meta":
-            continue
-        prop = str(child.attrib.get("property") or "").strip()
-        name = str(child.attrib.get("name") or "").strip()
-        if prop in {"dcterms:modified", "belongs-to-collection"}:
-            metadata_node.remove(child)
-            continue
-        if name == "rating":
-            metadata_node.remove(child)
-            continue
-        if (not keep_cover or cover_meta_id) and name == "cover":
-            metadata_node.remove(child)
+    _clear_opf_metadata(metadata_node, drop_cover=not keep_cover or bool(cover_meta_id))
 
     identifier = meta.identifier or meta.book_id
     if not identifier.startswith("urn:"):
         identifier = f"urn:uuid:{identifier}"
-    identifier_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}identifier")
+    identifier_el = LXML_ET.SubElement(metadata_node, DC_TAGS["identifier"])
     identifier_el.text = identifier
 
-    title_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}title")
+    title_el = LXML_ET.SubElement(metadata_node, DC_TAGS["title"])
     title_el.text = meta.title
 
-    language_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}language")
+    language_el = LXML_ET.SubElement(metadata_node, DC_TAGS["language"])
     language_el.text = meta.language or "zh-CN"
 
     if meta.author:
-        author_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}creator")
+        author_el = LXML_ET.SubElement(metadata_node, DC_TAGS["creator"])
         author_el.text = meta.author
     if meta.description:
-        description_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}description")
+        description_el = LXML_ET.SubElement(metadata_node, DC_TAGS["description"])
         description_el.text = meta.description
     if meta.publisher:
-        publisher_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}publisher")
+        publisher_el = LXML_ET.SubElement(metadata_node, DC_TAGS["publisher"])
         publisher_el.text = meta.publisher
     if meta.published:
-        published_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}date")
+        published_el = LXML_ET.SubElement(metadata_node, DC_TAGS["date"])
         published_el.text = meta.published
     if meta.identifier:
-        user_identifier_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}identifier")
+        user_identifier_el = LXML_ET.SubElement(metadata_node, DC_TAGS["identifier"])
         user_identifier_el.set("id", "identifier")
         user_identifier_el.text = meta.identifier
     if meta.series:
-        series_el = ET.SubElement(metadata_node, f"{{{OPF_NS}}}meta")
+        series_el = LXML_ET.SubElement(metadata_node, OPF_META_TAG)
         series_el.set("property", "belongs-to-collection")
         series_el.text = meta.series
     if meta.isbn:
-        isbn_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}identifier")
+        isbn_el = LXML_ET.SubElement(metadata_node, DC_TAGS["identifier"])
         isbn_el.set("id", "isbn")
         isbn_el.text = meta.isbn
+    subject_tag = DC_TAGS["subject"]
+    sub_element = LXML_ET.SubElement
     for tag in meta.tags:
         if not tag:
             continue
-        subject_el = ET.SubElement(metadata_node, f"{{{DC_NS}}}subject")
-        subject_el.text = tag
+        sub_element(metadata_node, subject_tag).text = tag
     if meta.rating is not None:
-        rating_el = ET.SubElement(metadata_node, f"{{{OPF_NS}}}meta")
+        rating_el = LXML_ET.SubElement(metadata_node, OPF_META_TAG)
         rating_el.set("name", "rating")
         rating_el.text = str(meta.rating)
 
@@ -842,42 +1227,55 @@ def _apply_metadata_to_opf_root(
         .isoformat()
         .replace("+00:00", "Z")
     )
-    modified_el = ET.SubElement(metadata_node, f"{{{OPF_NS}}}meta")
+    modified_el = LXML_ET.SubElement(metadata_node, OPF_META_TAG)
     modified_el.set("property", "dcterms:modified")
     modified_el.text = modified
     if cover_meta_id:
-        cover_el = ET.SubElement(metadata_node, f"{{{OPF_NS}}}meta")
+        cover_el = LXML_ET.SubElement(metadata_node, OPF_META_TAG)
         cover_el.set("name", "cover")
         cover_el.set("content", cover_meta_id)
 
 
+def _opf_metadata_fingerprint(metadata_node: LXML_ET._Element) -> list[tuple[str, tuple, str]]:
+    fingerprint: list[tuple[str, tuple, str]] = []
+    for child in metadata_node:
+        if not isinstance(child.tag, str):
+            continue
+        if str(child.attrib.get("property") or "").strip() == "dcterms:modified":
+            continue
+        fingerprint.append((child.tag, tuple(sorted(child.attrib.items())), (child.text or "").strip()))
+    return fingerprint
+
+
 def _rewrite_opf_metadata(
     opf_bytes: bytes,
     meta: Metadata,
     *,
     keep_cover: bool,
     cover_meta_id: Optional[str] = None,
-) -> bytes:
-    root = ET.fromstring(opf_bytes)
+) -> Optional[bytes]:
+    """Return the rewritten OPF, or None when only dcterms:modified would change."""
+
+    root = _xml_root_for_rewrite(opf_bytes)
+    metadata_node = _ensure_opf_metadata_node(root)
+    before = _opf_metadata_fingerprint(metadata_node)
     _apply_metadata_to_opf_root(root, meta, keep_cover=keep_cover, cover_meta_id=cover_meta_id)
-    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+    if _opf_metadata_fingerprint(metadata_node) == before:
+        return None
+    return _xml_document_bytes(root)
 
 
 def _update_epub_metadata_opf_only(epub_file: Path, meta: Metadata, *, keep_cover: bool) -> bool:
     if not epub_file.exists():
         return False
     with zipfile.ZipFile(epub_file, "r") as src:
-        infos = src.infolist()
+        canonical_infos, info_by_canonical = _canonical_zip_infos(src.infolist())
         try:
             opf_path = _opf_path_from_container(src)
         except Exception:
             return False
 
-        opf_info: Optional[zipfile.ZipInfo] = None
-        for info in infos:
-            if _canonical_zip_member(info.filename) == opf_path:
-                opf_info = info
-                break
+        opf_info = info_by_canonical.get(opf_path)
         if opf_info is None:
             return False
 
@@ -885,27 +1283,19 @@ def _update_epub_metadata_opf_only(epub_file: Path, meta: Metadata, *, keep_cove
             rewritten_opf = _rewrite_opf_metadata(src.read(opf_info), meta, keep_cover=keep_cover)
         except Exception:
             return False
+        if rewritten_opf is None:
+            # Metadata already matches; leave the archive untouched.
+            return True
 
-        tmp_handle = tempfile.NamedTemporaryFile(
-            prefix=f"{epub_file.stem}.",
-            suffix=".epub",
-            dir=str(epub_file.parent),
-            delete=False,
-        )
-        tmp_path = Path(tmp_handle.name)
-        tmp_handle.close()
-
-        try:
+        with _atomic_epub_write(epub_file) as tmp_path:
             with zipfile.ZipFile(tmp_path, "w") as dst:
                 # Ensure mimetype is first and stored.
-                for info in infos:
-                    canonical = _canonical_zip_member(info.filename)
-                    if canonical != "mimetype":
-                        continue
-                    _copy_zip_member_stream(src, dst, info, output_name="mimetype", compress_type=zipfile.ZIP_STORED)
-                    break
-                for info in infos:
-                    canonical = _canonical_zip_member(info.filename)
+                mimetype_info = info_by_canonical.get("mimetype")
+                if mimetype_info is not None:
+                    _copy_zip_member_stream(
+                        src, dst, mimetype_info, output_name="mimetype", compress_type=zipfile.ZIP_STORED
+                    )
+                for info, canonical in canonical_infos:
                     if canonical == "mimetype":
                         continue
                     if canonical == opf_path:
@@ -913,11 +1303,7 @@ def _update_epub_metadata_opf_only(epub_file: Path, meta: Metadata, *, keep_cove
                         dst.writestr(zinfo, rewritten_opf)
                     else:
                         _copy_zip_member_stream(src, dst, info)
-            tmp_path.replace(epub_file)
-            return True
-        finally:
-            if tmp_path.exists():
-                tmp_path.unlink(missing_ok=True)
+        return True
 
 
 def _update_epub_preserve_documents(
@@ -935,91 +1321,88 @@ def _update_epub_preserve_documents(
         return False
 
     with zipfile.ZipFile(epub_file, "r") as src:
-        infos = src.infolist()
+        canonical_infos, info_by_canonical = _canonical_zip_infos(src.infolist())
         try:
             opf_path = _opf_path_from_container(src)
         except Exception:
             return False
-        opf_info = next((info for info in infos if _canonical_zip_member(info.filename) == opf_path), None)
+        opf_info = info_by_canonical.get(opf_path)
         if opf_info is None:
             return False
 
-        root = ET.fromstring(src.read(opf_info.filename))
-        manifest = root.find(f"{{{OPF_NS}}}manifest")
+        root = _xml_root_for_rewrite(src.read(opf_info.filename))
+        manifest = root.find(OPF_MANIFEST_TAG)
         if manifest is None:
             manifest = _find_first_child_by_local_name(root, "manifest")
         if manifest is None:
             return False
-        spine = root.find(f"{{{OPF_NS}}}spine")
+        spine = root.find(OPF_SPINE_TAG)
         if spine is None:
             spine = _find_first_child_by_local_name(root, "spine")
 
-        manifest_items = [item for item in list(manifest) if _tag_local_name(item.tag) == "item"]
-        items_by_id: dict[str, ET.Element] = {}
-        for item in manifest_items:
-            item_id = str(item.attrib.get("id") or "").strip()
-            if item_id:
-                items_by_id[item_id] = item
+        # Read each item's attributes once; the scans below only consult these snapshots.
+        manifest_entries: list[tuple[LXML_ET._Element, _ZipManifestItem]] = []
+        for item in manifest:
+            if _tag_local_name(item.tag) != "item":
+                continue
+            href = str(item.attrib.get("href") or "").strip()
+            manifest_entries.append(
+                (
+                    item,
+                    _ZipManifestItem(
+                        item_id=str(item.attrib.get("id") or "").strip(),
+                        href=href,
+                        media_type=str(item.attrib.get("media-type") or "").strip().lower(),
+                        properties=set(str(item.attrib.get("properties") or "").split()),
+                        member_path=_resolve_opf_href(opf_path, href) if href else "",
+                    ),
+                )
+            )
+        items_by_id: dict[str, _ZipManifestItem] = {}
+        for _, attrs in manifest_entries:
+            if attrs.item_id:
+                items_by_id[attrs.item_id] = attrs
 
-        doc_items: list[ET.Element] = []
+        doc_items: list[_ZipManifestItem] = []
         if spine is not None:
             for itemref in list(spine):
                 if _tag_local_name(itemref.tag) != "itemref":
                     continue
                 idref = str(itemref.attrib.get("idref") or "").strip()
-                if not idref or idref not in items_by_id:
+                attrs = items_by_id.get(idref) if idref else None
+                if attrs is None:
                     continue
-                item = items_by_id[idref]
-                media_type = str(item.attrib.get("media-type") or "").strip().lower()
-                properties = str(item.attrib.get("properties") or "")
-                if media_type not in {"application/xhtml+xml", "text/html"}:
+                if attrs.media_type not in DOCUMENT_MEDIA_TYPES or "nav" in attrs.properties:
                     continue
-                if "nav" in properties.split():
-                    continue
-                doc_items.append(item)
+                doc_items.append(attrs)
         if not doc_items:
-            for item in manifest_items:
-                media_type = str(item.attrib.get("media-type") or "").strip().lower()
-                properties = str(item.attrib.get("properties") or "")
-                if media_type not in {"application/xhtml+xml", "text/html"}:
-                    continue
-                if "nav" in properties.split():
+            for _, attrs in manifest_entries:
+                if attrs.media_type not in DOCUMENT_MEDIA_TYPES or "nav" in attrs.properties:
                     continue
-                doc_items.append(item)
+                doc_items.append(attrs)
 
-        doc_members: list[str] = []
-        for item in doc_items:
-            href = str(item.attrib.get("href") or "").strip()
-            if not href:
-                continue
-            member = _resolve_opf_href(opf_path, href)
-            if member:
-                doc_members.append(member)
+        doc_members = [attrs.member_path for attrs in doc_items if attrs.member_path]
 
         opf_dir = PurePosixPath(opf_path).parent.as_posix()
         opf_dir_start = opf_dir if opf_dir not in {"", "."} else "."
 
-        replacements: dict[str, bytes] = {}
+        # Small text payloads are kept as bytes; the cover is streamed from disk.
+        replacements: dict[str, Union[bytes, Path]] = {}
         remove_members: set[str] = set()
 
         css_member: Optional[str] = None
         if css_requested or strip_original_css:
-            removable_css_items: list[ET.Element] = []
-            for item in manifest_items:
-                item_id = str(item.attrib.get("id") or "")
-                href_name = Path(str(item.attrib.get("href") or "")).name.lower()
-                media_type = str(item.attrib.get("media-type") or "").strip().lower()
-                is_bindery_css = href_name in BINDERY_CSS_BASENAMES or item_id.startswith("bindery-css")
-                is_any_css = media_type == "text/css"
-                if is_bindery_css or (strip_original_css and is_any_css):
-                    removable_css_items.append(item)
-
-            for item in removable_css_items:
-                href = str(item.attrib.get("href") or "").strip()
-                if href:
-                    member = _resolve_opf_href(opf_path, href)
-                    if member:
-                        remove_members.add(member)
+            # One pass over the attribute snapshots; no Path objects for the (often
+            # thousands of) image items that are never removed.
+            for item, attrs in manifest_entries:
+                if not (
+                    (strip_original_css and attrs.media_type == "text/css")
+                    or attrs.item_id.startswith("bindery-css")
+                    or _is_bindery_css_href(attrs.href)
+                ):
+                    continue
+                if attrs.member_path:
+                    remove_members.add(attrs.member_path)
                 manifest.remove(item)
 
             if css_requested and css_clean:
@@ -1031,7 +1414,7 @@ def _update_epub_preserve_documents(
                 while css_item_id in items_by_id:
                     css_item_id = f"bindery-css-{suffix}"
                     suffix += 1
-                css_item = ET.SubElement(manifest, f"{{{OPF_NS}}}item")
+                css_item = LXML_ET.SubElement(manifest, OPF_ITEM_TAG)
                 css_item.set("id", css_item_id)
                 css_item.set("href", css_href)
                 css_item.set("media-type", "text/css")
@@ -1039,27 +1422,22 @@ def _update_epub_preserve_documents(
 
         cover_meta_id: Optional[str] = None
         if cover_ok and cover_path is not None:
-            cover_bytes = cover_path.read_bytes()
             original_name = cover_path.name or "cover.jpg"
             cover_media_type = _guess_image_media_type(original_name)
 
-            cover_item: Optional[ET.Element] = None
-            for item in manifest_items:
-                media_type = str(item.attrib.get("media-type") or "").strip().lower()
-                properties = str(item.attrib.get("properties") or "")
-                if "cover-image" in properties.split():
-                    cover_item = item
+            cover_item: Optional[LXML_ET._Element] = None
+            cover_attrs: Optional[_ZipManifestItem] = None
+            for item, attrs in manifest_entries:
+                if "cover-image" in attrs.properties or (
+                    attrs.media_type.startswith("image/")
+                    and ("cover" in attrs.item_id.lower() or "cover" in attrs.href.lower())
+                ):
+                    cover_item, cover_attrs = item, attrs
                     break
-                if media_type.startswith("image/"):
-                    item_id = str(item.attrib.get("id") or "").strip().lower()
-                    item_href = str(item.attrib.get("href") or "").strip().lower()
-                    if "cover" in item_id or "cover" in item_href:
-                        cover_item = item
-                        break
 
-            if cover_item is not None:
-                cover_item_id = str(cover_item.attrib.get("id") or "").strip() or "cover-image"
-                cover_href = str(cover_item.attrib.get("href") or "").strip()
+            if cover_item is not None and cover_attrs is not None:
+                cover_item_id = cover_attrs.item_id or "cover-image"
+                cover_href = cover_attrs.href
                 ext = Path(original_name).suffix or Path(cover_href).suffix or ".jpg"
                 if not cover_href:
                     cover_href = f"Images/cover{ext.lower()}"
@@ -1079,14 +1457,14 @@ def _update_epub_preserve_documents(
                 while cover_item_id in items_by_id:
                     cover_item_id = f"cover-image-{suffix}"
                     suffix += 1
-                cover_item = ET.SubElement(manifest, f"{{{OPF_NS}}}item")
+                cover_item = LXML_ET.SubElement(manifest, OPF_ITEM_TAG)
                 cover_item.set("id", cover_item_id)
                 cover_item.set("href", cover_href)
                 cover_item.set("media-type", cover_media_type)
                 cover_item.set("properties", "cover-image")
                 cover_meta_id = cover_item_id
 
-            replacements[cover_member] = cover_bytes
+            replacements[cover_member] = cover_path
 
         _apply_metadata_to_opf_root(
             root,
@@ -1094,76 +1472,78 @@ def _update_epub_preserve_documents(
             keep_cover=not cover_ok,
             cover_meta_id=cover_meta_id,
         )
-        replacements[opf_path] = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        if css_requested or strip_original_css:
+            _set_bindery_css_digest(root, _css_digest(css_clean) if css_member else None)
+        replacements[opf_path] = _xml_document_bytes(root)
         doc_member_set = set(doc_members)
-
-        tmp_handle = tempfile.NamedTemporaryFile(
-            prefix=f"{epub_file.stem}.",
-            suffix=".epub",
-            dir=str(epub_file.parent),
-            delete=False,
-        )
-        tmp_path = Path(tmp_handle.name)
-        tmp_handle.close()
+        css_href_by_dir: dict[str, str] = {}
 
         written: set[str] = set()
-        try:
+        with _atomic_epub_write(epub_file) as tmp_path:
             with zipfile.ZipFile(tmp_path, "w") as dst:
                 # Ensure mimetype is first and stored.
-                for info in infos:
-                    canonical = _canonical_zip_member(info.filename)
-                    if canonical != "mimetype" or canonical in written:
-                        continue
-                    replacement = replacements.get(canonical)
-                    if replacement is not None:
+                mimetype_info = info_by_canonical.get("mimetype")
+                if mimetype_info is not None:
+                    replacement = replacements.get("mimetype")
+                    if isinstance(replacement, bytes):
                         dst.writestr("mimetype", replacement, compress_type=zipfile.ZIP_STORED)
                     else:
-                        _copy_zip_member_stream(src, dst, info, output_name="mimetype", compress_type=zipfile.ZIP_STORED)
-                    written.add(canonical)
-
-                for info in infos:
-                    canonical = _canonical_zip_member(info.filename)
-                    if not canonical or canonical in written:
-                        continue
-                    if canonical in remove_members and canonical not in replacements:
-                        continue
-
-                    if (css_requested or strip_original_css) and canonical in doc_member_set:
-                        original_text = src.read(info.filename).decode("utf-8", errors="replace")
-                        href = _relative_href(canonical, css_member) if css_member else None
-                        patched = _patch_doc_html_bindery_css(
-                            original_text,
-                            href,
-                            strip_original_css=strip_original_css,
-                        ).encode("utf-8")
-                        zinfo = _clone_zip_info(info)
-                        dst.writestr(zinfo, patched)
+                        _copy_zip_member_stream(
+                            src, dst, mimetype_info, output_name="mimetype", compress_type=zipfile.ZIP_STORED
+                        )
+                    written.add("mimetype")
+
+                # Patched chapters are re-deflated on worker threads; every other member
+                # is copied raw, so the queue is flushed first to keep archive order.
+                with _OrderedDeflateWriter(dst, BUILD_COMPRESS_WORKERS) as writer:
+                    for info, canonical in canonical_infos:
+                        if not canonical or canonical in written:
+                            continue
+                        if canonical in remove_members and canonical not in replacements:
+                            continue
+
+                        if (css_requested or strip_original_css) and canonical in doc_member_set:
+                            original_text = src.read(info.filename).decode("utf-8", errors="replace")
+                            href = None
+                            if css_member:
+                                # Chapters usually share one directory, so the relative href repeats.
+                                doc_dir = canonical.rpartition("/")[0]
+                                href = css_href_by_dir.get(doc_dir)
+                                if href is None:
+                                    href = css_href_by_dir[doc_dir] = _relative_href(canonical, css_member)
+                            patched = _patch_doc_html_bindery_css(
+                                original_text,
+                                href,
+                                strip_original_css=strip_original_css,
+                            )
+                            if patched != original_text:
+                                writer.write(_clone_zip_info(info), patched.encode("utf-8"))
+                            else:
+                                writer.flush()
+                                _copy_zip_member_stream(src, dst, info)
+                            written.add(canonical)
+                            continue
+
+                        writer.flush()
+                        replacement = replacements.get(canonical)
+                        if replacement is not None:
+                            zinfo = _clone_zip_info(info, compress_type=_member_compress_type(canonical))
+                            _write_zip_payload(dst, zinfo, replacement)
+                        else:
+                            _copy_zip_member_stream(src, dst, info)
                         written.add(canonical)
-                        continue
-
-                    replacement = replacements.get(canonical)
-                    if replacement is not None:
-                        zinfo = _clone_zip_info(info)
-                        dst.writestr(zinfo, replacement)
-                    else:
-                        _copy_zip_member_stream(src, dst, info)
-                    written.add(canonical)
 
                 for canonical, content in replacements.items():
                     if canonical in written:
                         continue
-                    if canonical == "mimetype":
+                    if canonical == "mimetype" and isinstance(content, bytes):
                         dst.writestr("mimetype", content, compress_type=zipfile.ZIP_STORED)
                     else:
                         zinfo = zipfile.ZipInfo(canonical)
-                        zinfo.compress_type = zipfile.ZIP_DEFLATED
-                        dst.writestr(zinfo, content)
+                        zinfo.compress_type = _member_compress_type(canonical)
+                        _write_zip_payload(dst, zinfo, content)
 
-            tmp_path.replace(epub_file)
-            return True
-        finally:
-            if tmp_path.exists():
-                tmp_path.unlink(missing_ok=True)
+        return True
 
 
 def _split_chapter_title(title: str, kind: str) -> tuple[Optional[str], str]:
@@ -1188,6 +1568,19 @@ def _normalize_paragraph_lines(lines: Iterable[str]) -> list[str]:
     return [line for line in lines if line]
 
 
+def _paragraphs_markup(paragraphs: list[str]) -> Markup:
+    """Render ``<p>`` lines for the section templates with a single escape call."""
+
+    if not paragraphs:
+        return Markup("")
+    joined = "\n".join(paragraphs)
+    if joined.count("\n") != len(paragraphs) - 1:
+        # A paragraph carries its own newline; escape one by one so it stays in one <p>.
+        return Markup("\n".join(f"    <p>{escape(paragraph)}</p>" for paragraph in paragraphs))
+    body = str(escape(joined)).replace("\n", "</p>\n    <p>")
+    return Markup(f"    <p>{body}</p>")
+
+
 def _render_section(title: str, lines: Iterable[str], lang: str, kind: str = "chapter") -> str:
     paragraphs = _normalize_paragraph_lines(lines)
     stamp, main_title = _split_chapter_title(title, kind)
@@ -1198,24 +1591,27 @@ def _render_section(title: str, lines: Iterable[str], lang: str, kind: str = "ch
         kind=kind,
         stamp=stamp,
         main_title=main_title,
-        paragraphs=paragraphs,
+        paragraphs_html=_paragraphs_markup(paragraphs),
     )
 
 
-def _render_intro(title: str, author: Optional[str], intro: str, lang: str) -> str:
-    paragraphs = [raw.strip() for raw in intro.splitlines() if raw.strip()]
+def _intro_paragraphs(intro: str) -> list[str]:
+    return [line for line in (raw.strip() for raw in intro.splitlines()) if line]
+
+
+def _render_intro(title: str, author: Optional[str], paragraphs: list[str], lang: str) -> str:
     return _render_epub_template(
         "intro.xhtml.j2",
         lang=lang,
         title=title,
         author=author,
-        paragraphs=paragraphs,
+        paragraphs_html=_paragraphs_markup(paragraphs),
     )
 
 
 def _safe_epub_member_name(filename: str, fallback: str) -> str:
     raw_name = Path(filename or "").name
-    cleaned = re.sub(r"[^0-9A-Za-z._-]+", "_", raw_name).strip("._")
+    cleaned = UNSAFE_MEMBER_CHARS_RE.sub("_", raw_name).strip("._")
     if not cleaned:
         return fallback
     if "." not in cleaned and "." in fallback:
@@ -1240,13 +1636,17 @@ def update_epub_metadata(
     cover_ok = bool(cover_path and cover_path.exists())
     css_requested = css_text is not None
     css_clean = css_text.strip() if isinstance(css_text, str) else ""
+    # The overlay already embedded in the book matches; documents need no patching.
+    if css_requested and css_clean and not cover_ok and not strip_original_css:
+        if _epub_bindery_css_digest(epub_file) == _css_digest(css_clean):
+            css_requested = False
     # Keep original chapter XHTML untouched when only OPF metadata changes are required.
+    # Member names were canonicalised above and this path keeps them, so no second pass.
     if not cover_ok and not css_requested and not strip_original_css:
         if _update_epub_metadata_opf_only(epub_file, meta, keep_cover=True):
-            _normalize_epub_archive_paths(epub_file)
             return
     # For EPUB writeback with cover/css updates, prefer zip-level patching
-    # so original chapter head/style can be preserved.
+    # so original chapter head/style can be preserved. New members get canonical names.
     if _update_epub_preserve_documents(
         epub_file,
         meta,
@@ -1254,7 +1654,6 @@ def update_epub_metadata(
         css_text=css_text,
         strip_original_css=strip_original_css,
     ):
-        _normalize_epub_archive_paths(epub_file)
         return
     raise ValueError("Failed to update EPUB metadata using zip/lxml pipeline")
 
@@ -1290,7 +1689,7 @@ def build_epub(
 
     if book_data.intro:
         intro_file = "Text/section_0000.xhtml"
-        intro_lines = [raw.strip() for raw in book_data.intro.splitlines() if raw.strip()]
+        intro_lines = _intro_paragraphs(book_data.intro)
         sections.append(
             _BuildSection(
                 item_id="sec0000",
@@ -1325,13 +1724,11 @@ def build_epub(
     cover_href: Optional[str] = None
     cover_media_type: Optional[str] = None
     cover_item_id: Optional[str] = None
-    cover_bytes: Optional[bytes] = None
     if cover_path and cover_path.exists():
         cover_name = _safe_epub_member_name(cover_path.name, "cover.jpg")
         cover_href = f"Images/{cover_name}"
         cover_media_type = _guess_image_media_type(cover_name)
         cover_item_id = "cover-image"
-        cover_bytes = cover_path.read_bytes()
 
     container_xml = _render_epub_template("container.xml.j2")
     opf_xml = _render_epub_template(
@@ -1358,24 +1755,32 @@ def build_epub(
     toc_ncx = _render_epub_template("toc.ncx.j2", title=meta.title, sections=sections)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(output_path, "w") as zf:
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
         zf.writestr("mimetype", b"application/epub+zip", compress_type=zipfile.ZIP_STORED)
         zf.writestr("META-INF/container.xml", container_xml.encode("utf-8"))
         zf.writestr("EPUB/content.opf", opf_xml.encode("utf-8"))
         zf.writestr("EPUB/nav.xhtml", nav_xhtml.encode("utf-8"))
         zf.writestr("EPUB/toc.ncx", toc_ncx.encode("utf-8"))
         zf.writestr("EPUB/Styles/style.css", css.encode("utf-8"))
-        for section in sections:
-            if section.kind == "intro":
-                intro_text = "\n".join(section.lines)
-                content = _render_intro(meta.title, meta.author or book_data.author, intro_text, lang)
-            else:
-                content = _render_section(section.title, section.lines, lang, kind=section.kind)
-            zf.writestr(f"EPUB/{section.file_name}", content.encode("utf-8"))
-        if cover_href and cover_bytes is not None:
-            zf.writestr(f"EPUB/{cover_href}", cover_bytes)
 
-    _normalize_epub_archive_paths(output_path)
+        def rendered_sections() -> Iterator[tuple[str, bytes]]:
+            for section in sections:
+                if section.kind == "intro":
+                    content = _render_intro(meta.title, meta.author or book_data.author, section.lines, lang)
+                else:
+                    content = _render_section(section.title, section.lines, lang, kind=section.kind)
+                yield f"EPUB/{section.file_name}", content.encode("utf-8")
+
+        with _OrderedDeflateWriter(zf, BUILD_COMPRESS_WORKERS) as writer:
+            for name, payload in rendered_sections():
+                writer.write(_new_zip_info(name), payload)
+        if cover_href and cover_path is not None:
+            zf.write(cover_path, f"EPUB/{cover_href}", compress_type=zipfile.ZIP_STORED)
+        # Check names on the open archive so the common case skips a reopen.
+        needs_normalize = _has_noncanonical_members(zf)
+
+    if needs_normalize:
+        _normalize_epub_archive_paths(output_path)
 
 
 def build_epub_from_section_stream(
@@ -1391,123 +1796,120 @@ def build_epub_from_section_stream(
     lang = meta.language or "zh-CN"
     css = css_text.strip() if css_text and css_text.strip() else ""
     sections: list[_BuildSection] = []
-    section_file_paths: dict[str, Path] = {}
     section_index = 1
 
-    def add_rendered_section(kind: str, title: str, lines: Iterable[str]) -> None:
-        nonlocal section_index
-        file_name = f"Text/section_{section_index:04d}.xhtml"
-        item_id = f"sec{section_index:04d}"
-        section_index += 1
-        normalized_lines = _normalize_paragraph_lines(lines)
-        section = _BuildSection(
-            item_id=item_id,
-            title=title,
-            href=file_name,
-            file_name=file_name,
-            kind=kind,
-            lines=[],
-        )
-        sections.append(section)
-        if kind == "intro":
-            body_text = "\n".join(normalized_lines)
-            rendered = _render_intro(meta.title, meta.author or source_author, body_text, lang)
-        else:
-            rendered = _render_section(title, normalized_lines, lang, kind=kind)
-        relative_file = Path("EPUB") / file_name
-        target = temp_root / relative_file
-        target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_text(rendered, encoding="utf-8")
-        section_file_paths[file_name] = target
-
-    with tempfile.TemporaryDirectory(prefix=f"{output_path.stem}.", dir=str(output_path.parent)) as tmp_dir:
-        temp_root = Path(tmp_dir)
-
-        if source_intro:
-            intro_lines = [raw.strip() for raw in source_intro.splitlines() if raw.strip()]
-            add_rendered_section("intro", "简介", intro_lines)
-
-        for entry in stream_sections:
-            add_rendered_section(entry.kind, entry.title, entry.lines)
-
-        if not sections:
-            add_rendered_section("chapter", "正文", ["（无内容）"])
-
-        identifier_value = meta.identifier or meta.book_id
-        identifier_urn = identifier_value if str(identifier_value).startswith("urn:") else f"urn:uuid:{identifier_value}"
-        modified = (
-            dt.datetime.now(dt.timezone.utc)
-            .replace(microsecond=0)
-            .isoformat()
-            .replace("+00:00", "Z")
-        )
-        tags = [tag for tag in meta.tags if tag]
-
-        cover_href: Optional[str] = None
-        cover_media_type: Optional[str] = None
-        cover_item_id: Optional[str] = None
-        cover_bytes: Optional[bytes] = None
-        if cover_path and cover_path.exists():
-            cover_name = _safe_epub_member_name(cover_path.name, "cover.jpg")
-            cover_href = f"Images/{cover_name}"
-            cover_media_type = _guess_image_media_type(cover_name)
-            cover_item_id = "cover-image"
-            cover_bytes = cover_path.read_bytes()
-
-        container_xml = _render_epub_template("container.xml.j2")
-        opf_xml = _render_epub_template(
-            "content.opf.j2",
-            identifier_urn=identifier_urn,
-            identifier=meta.identifier,
-            isbn=meta.isbn,
-            title=meta.title,
-            language=lang,
-            author=meta.author,
-            description=meta.description,
-            publisher=meta.publisher,
-            published=meta.published,
-            series=meta.series,
-            tags=tags,
-            rating=meta.rating,
-            modified=modified,
-            sections=sections,
-            cover_href=cover_href,
-            cover_media_type=cover_media_type,
-            cover_item_id=cover_item_id,
-        )
-        nav_xhtml = _render_epub_template("nav.xhtml.j2", title=meta.title, lang=lang, sections=sections)
-        toc_ncx = _render_epub_template("toc.ncx.j2", title=meta.title, sections=sections)
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, "w") as zf:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Chapters go straight into the archive as they are rendered (mimetype first, the
+    # package documents once every section is known) instead of via temp files.
+    with _atomic_epub_write(output_path) as tmp_path:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
             zf.writestr("mimetype", b"application/epub+zip", compress_type=zipfile.ZIP_STORED)
+
+            with _OrderedDeflateWriter(zf, BUILD_COMPRESS_WORKERS) as writer:
+
+                def add_rendered_section(kind: str, title: str, lines: Iterable[str]) -> None:
+                    nonlocal section_index
+                    file_name = f"Text/section_{section_index:04d}.xhtml"
+                    item_id = f"sec{section_index:04d}"
+                    section_index += 1
+                    normalized_lines = _normalize_paragraph_lines(lines)
+                    sections.append(
+                        _BuildSection(
+                            item_id=item_id,
+                            title=title,
+                            href=file_name,
+                            file_name=file_name,
+                            kind=kind,
+                            lines=[],
+                        )
+                    )
+                    if kind == "intro":
+                        rendered = _render_intro(meta.title, meta.author or source_author, normalized_lines, lang)
+                    else:
+                        rendered = _render_section(title, normalized_lines, lang, kind=kind)
+                    writer.write(_new_zip_info(f"EPUB/{file_name}"), rendered.encode("utf-8"))
+
+                if source_intro:
+                    intro_lines = _intro_paragraphs(source_intro)
+                    add_rendered_section("intro", "简介", intro_lines)
+
+                for entry in stream_sections:
+                    add_rendered_section(entry.kind, entry.title, entry.lines)
+
+                if not sections:
+                    add_rendered_section("chapter", "正文", ["（无内容）"])
+
+            identifier_value = meta.identifier or meta.book_id
+            identifier_urn = (
+                identifier_value if str(identifier_value).startswith("urn:") else f"urn:uuid:{identifier_value}"
+            )
+            modified = (
+                dt.datetime.now(dt.timezone.utc)
+                .replace(microsecond=0)
+                .isoformat()
+                .replace("+00:00", "Z")
+            )
+            tags = [tag for tag in meta.tags if tag]
+
+            cover_href: Optional[str] = None
+            cover_media_type: Optional[str] = None
+            cover_item_id: Optional[str] = None
+            if cover_path and cover_path.exists():
+                cover_name = _safe_epub_member_name(cover_path.name, "cover.jpg")
+                cover_href = f"Images/{cover_name}"
+                cover_media_type = _guess_image_media_type(cover_name)
+                cover_item_id = "cover-image"
+
+            container_xml = _render_epub_template("container.xml.j2")
+            opf_xml = _render_epub_template(
+                "content.opf.j2",
+                identifier_urn=identifier_urn,
+                identifier=meta.identifier,
+                isbn=meta.isbn,
+                title=meta.title,
+                language=lang,
+                author=meta.author,
+                description=meta.description,
+                publisher=meta.publisher,
+                published=meta.published,
+                series=meta.series,
+                tags=tags,
+                rating=meta.rating,
+                modified=modified,
+                sections=sections,
+                cover_href=cover_href,
+                cover_media_type=cover_media_type,
+                cover_item_id=cover_item_id,
+            )
+            nav_xhtml = _render_epub_template("nav.xhtml.j2", title=meta.title, lang=lang, sections=sections)
+            toc_ncx = _render_epub_template("toc.ncx.j2", title=meta.title, sections=sections)
+
             zf.writestr("META-INF/container.xml", container_xml.encode("utf-8"))
             zf.writestr("EPUB/content.opf", opf_xml.encode("utf-8"))
             zf.writestr("EPUB/nav.xhtml", nav_xhtml.encode("utf-8"))
             zf.writestr("EPUB/toc.ncx", toc_ncx.encode("utf-8"))
             zf.writestr("EPUB/Styles/style.css", css.encode("utf-8"))
-            for section in sections:
-                chapter_path = section_file_paths.get(section.file_name)
-                if chapter_path is None:
-                    continue
-                zf.write(chapter_path, arcname=f"EPUB/{section.file_name}")
-            if cover_href and cover_bytes is not None:
-                zf.writestr(f"EPUB/{cover_href}", cover_bytes)
+            if cover_href and cover_path is not None:
+                zf.write(cover_path, f"EPUB/{cover_href}", compress_type=zipfile.ZIP_STORED)
+            needs_normalize = _has_noncanonical_members(zf)
 
-    _normalize_epub_archive_paths(output_path)
+    if needs_normalize:
+        _normalize_epub_archive_paths(output_path)
 
 
 def extract_cover(epub_file: Path) -> Optional[tuple[bytes, str]]:
     if not epub_file.exists():
         return None
+    try:
+        package = _epub_package(epub_file)
+    except zipfile.BadZipFile:
+        raise
+    except Exception:
+        return None
     with zipfile.ZipFile(epub_file, "r") as zf:
-        index = _zip_member_index(zf)
-        try:
-            opf_path, root = _opf_root_from_zip(zf, index)
-        except Exception:
-            return None
-        manifest_items, items_by_id = _manifest_from_opf(opf_path, root)
-        metadata = root.find(f"{{{OPF_NS}}}metadata")
+        root = package.root
+        manifest_items, items_by_id = package.manifest_items, package.items_by_id
+        metadata = root.find(OPF_METADATA_TAG)
         if metadata is None:
             metadata = _child_by_local_name(root, "metadata")
 
@@ -1524,20 +1926,24 @@ def extract_cover(epub_file: Path) -> Optional[tuple[bytes, str]]:
                         cover_item = candidate
                         break
         if cover_item is None:
-            for item in manifest_items:
-                if item.media_type.startswith("image/") and "cover-image" in item.properties:
-                    cover_item = item
-                    break
-        if cover_item is None:
+            # One manifest pass: a cover-image property wins outright, otherwise
+            # keep the first image whose id or path mentions "cover".
+            named_cover: Optional[_ZipManifestItem] = None
             for item in manifest_items:
                 if not item.media_type.startswith("image/"):
                     continue
-                if "cover" in item.item_id.lower() or "cover" in item.member_path.lower():
+                if "cover-image" in item.properties:
                     cover_item = item
                     break
+                if named_cover is None and ("cover" in item.item_id.lower() or "cover" in item.member_path.lower()):
+                    named_cover = item
+            cover_item = cover_item or named_cover
         if cover_item is None:
             return None
-        payload = _read_member_bytes(zf, index, cover_item.member_path)
+        # Manifest hrefs resolve to the stored name in well-formed books; index on a miss only.
+        payload = _read_exact_member(zf, cover_item.member_path)
+        if payload is None:
+            payload = _read_member_bytes(zf, _zip_member_index(zf), cover_item.member_path)
         if payload is None:
             return None
         return payload, cover_item.member_path
@@ -1545,17 +1951,28 @@ def extract_cover(epub_file: Path) -> Optional[tuple[bytes, str]]:
 
 
 def _looks_like_isbn(value: str) -> bool:
-    cleaned = re.sub(r"[^0-9Xx]", "", value or "")
-    return len(cleaned) in {10, 13}
+    if not value or len(value) < 10:
+        return False
+    count = 0
+    for char in value:
+        if char in ISBN_CHARS:
+            count += 1
+            if count > 13:
+                return False
+    return count in (10, 13)
 
 
 def extract_epub_metadata(epub_file: Path, fallback_title: str) -> dict:
     with zipfile.ZipFile(epub_file, "r") as zf:
-        index = _zip_member_index(zf)
-        _, root = _opf_root_from_zip(zf, index)
-        metadata = root.find(f"{{{OPF_NS}}}metadata")
+        metadata = None
+        opf_path = _opf_path_from_container(zf)
+        if opf_path in zf.NameToInfo:
+            # Inflate the OPF only up to </metadata>; the manifest and spine are never read.
+            with zf.open(opf_path) as stream:
+                metadata = _opf_metadata_from_stream(stream)
         if metadata is None:
-            metadata = _child_by_local_name(root, "metadata")
+            _, opf_raw = _opf_bytes_from_zip(zf)
+            metadata = _opf_metadata_from_bytes(opf_raw)
 
     if metadata is None:
         return {
@@ -1574,17 +1991,21 @@ def extract_epub_metadata(epub_file: Path, fallback_title: str) -> dict:
 
     dc_values: dict[str, list[tuple[str, dict[str, str]]]] = {}
     opf_meta_values: list[tuple[str, dict[str, str]]] = []
-    for node in list(metadata):
+    no_attrs: dict[str, str] = {}
+    for node in metadata:
         local = _tag_local_name(getattr(node, "tag", None))
         # Some EPUB files include XML comments under <metadata>; skip non-element nodes.
-        if not local:
+        # Text and attributes are only gathered for fields that are read below.
+        if local == "meta" or local == "identifier":
+            attrs = {_tag_local_name(key): str(value) for key, value in node.attrib.items()}
+        elif local in DC_METADATA_LOCALS:
+            attrs = no_attrs
+        else:
             continue
         text = _node_text(node) or ""
-        attrs = {_tag_local_name(key): str(value) for key, value in node.attrib.items()}
         if local == "meta":
             opf_meta_values.append((text, attrs))
-            continue
-        if local in {"identifier", "title", "language", "creator", "description", "publisher", "date", "subject"}:
+        else:
             dc_values.setdefault(local, []).append((text, attrs))
 
     def first_dc(name: str) -> Optional[str]:
@@ -1646,80 +2067,192 @@ def extract_epub_metadata(epub_file: Path, fallback_title: str) -> dict:
     }
 
 
-def _strip_scripts(html_text: str) -> str:
-    return re.sub(r"<script\\b[^>]*>.*?</script>", "", html_text, flags=re.IGNORECASE | re.DOTALL)
+def _inject_base_bytes(content: bytes, base_href: str) -> bytes:
+    """Insert the preview <base> into the first <head>, expanding a self-closing one."""
 
+    base_tag = f'<base href="{html.escape(base_href, quote=True)}" />'.encode("utf-8")
+    match = HEAD_OPEN_BYTES_RE.search(content)
+    if match is None:
+        return b"".join((b"<head>", base_tag, b"</head>", content))
+    end = match.end()
+    if content[end - 2 : end] == b"/>":
+        attrs = content[match.start() + 5 : end - 2]
+        return b"".join((content[: match.start()], b"<head", attrs, b">", base_tag, b"</head>", content[end:]))
+    return b"".join((content[:end], base_tag, content[end:]))
 
-def _inject_base(html_text: str, base_href: str) -> str:
-    base_tag = f'<base href="{html.escape(base_href, quote=True)}" />'
-    # 预览时总是以我们自己的 /book/{id}/epub/... 作为资源基准；
-    # 若原文档存在 <base>，可能会把相对资源解析到错误位置（甚至逃逸出 /epub/）。
-    html_text = re.sub(r"<base\\b[^>]*>\\s*", "", html_text, flags=re.IGNORECASE)
 
-    # 处理 <head/>（自闭合）这种形式：需要展开成 <head>...</head> 才能放入 <base>。
-    match = re.search(r"<head([^>]*)\\s*/>", html_text, flags=re.IGNORECASE)
-    if match:
-        attrs = match.group(1) or ""
-        replacement = f"<head{attrs}>{base_tag}</head>"
-        return re.sub(r"<head([^>]*)\\s*/>", replacement, html_text, count=1, flags=re.IGNORECASE)
+def _declared_html_charset(content: bytes) -> str:
+    """Return the encoding a chapter declares (BOM, XML declaration or <meta>), else UTF-8."""
 
-    match = re.search(r"<head[^>]*>", html_text, flags=re.IGNORECASE)
-    if match:
-        idx = match.end()
-        return f"{html_text[:idx]}{base_tag}{html_text[idx:]}"
-    return f"<head>{base_tag}</head>{html_text}"
+    for bom, name in HTML_BOMS:
+        if content.startswith(bom):
+            return name
+    head = content[:HTML_CHARSET_SNIFF_BYTES]
+    match = XML_DECL_ENCODING_RE.match(head) or META_CHARSET_RE.search(head)
+    if match is None:
+        return "utf-8"
+    try:
+        name = codecs.lookup(match.group(1).decode("ascii")).name
+    except LookupError:
+        return "utf-8"
+    # As in browsers, an in-document UTF-16/32 label on ASCII-readable bytes means UTF-8.
+    return "utf-8" if name.startswith(("utf-16", "utf-32")) else name
+
+
+def _prepare_preview_html(content: bytes, base_href: str) -> bytes:
+    # Work on the stored bytes throughout: a chapter is never decoded and
+    # re-encoded just to drop scripts and splice in one tag.
+    return _inject_base_bytes(_strip_preview_tags(content), base_href)
+
+
+def _strip_preview_tags(content: bytes) -> bytes:
+    """Drop <script> elements and <base> tags in one forward scan.
+
+    An unclosed <script> does not make every later opener rescan to the end
+    of the document (quadratic on bad markup).
+    """
+
+    parts: list[bytes] = []
+    last = pos = 0
+    script_close_left = True
+    while True:
+        match = PREVIEW_TAG_RE.search(content, pos)
+        if match is None:
+            break
+        end = content.find(b">", match.end())
+        if end == -1:
+            break
+        if match.group(1).lower() == b"base":
+            stop = LEADING_SPACE_RE.match(content, end + 1).end()
+        elif content[end - 1 : end] == b"/":
+            stop = end + 1
+        else:
+            close = SCRIPT_CLOSE_RE.search(content, end + 1) if script_close_left else None
+            if close is None:
+                # No closer after this opener means none after any later one either.
+                script_close_left = False
+                pos = match.start() + 1
+                continue
+            stop = close.end()
+        parts.append(content[last : match.start()])
+        last = pos = stop
+    if not parts:
+        return content
+    parts.append(content[last:])
+    return b"".join(parts)
 
 
 def _extract_title_from_html(html_text: str) -> Optional[str]:
-    for pattern in (r"<title[^>]*>(.*?)</title>", r"<h1[^>]*>(.*?)</h1>", r"<h2[^>]*>(.*?)</h2>"):
-        match = re.search(pattern, html_text, flags=re.IGNORECASE | re.DOTALL)
-        if match:
-            text = re.sub(r"<[^>]+>", "", match.group(1))
-            text = html.unescape(text).strip()
+    # One scan finds the first <title>/<h1>/<h2> opener instead of one DOTALL sweep per tag;
+    # a usable <title> (the common case, inside <head>) stops the scan right away.
+    openers: dict[str, int] = {}
+    for match in TITLE_OPEN_RE.finditer(html_text):
+        tag = match.group(1).lower()
+        if tag in openers:
+            continue
+        openers[tag] = match.end()
+        if len(openers) == len(TITLE_TAGS) or (tag == "title" and _title_element_text(html_text, tag, match.end())):
+            break
+    for tag in TITLE_TAGS:
+        if tag in openers:
+            text = _title_element_text(html_text, tag, openers[tag])
             if text:
                 return text
     return None
 
 
+def _title_element_text(html_text: str, tag: str, start: int) -> Optional[str]:
+    close = TITLE_CLOSE_RES[tag].search(html_text, start)
+    if close is None:
+        return None
+    return html.unescape(TAG_RE.sub("", html_text[start : close.start()])).strip() or None
+
+
 def _path_lookup_keys(path: str) -> list[str]:
     normalized = _canonical_zip_member(path)
     if not normalized:
         return []
+    # At most three keys, so membership checks on the list beat a seen-set.
     keys: list[str] = [normalized]
-    if normalized.startswith("EPUB/"):
+    if normalized.startswith("EPUB/") and normalized[5:]:
         keys.append(normalized[5:])
-    keys.append(PurePosixPath(normalized).name)
-    deduped: list[str] = []
-    seen: set[str] = set()
-    for key in keys:
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        deduped.append(key)
-    return deduped
+    name = normalized.rpartition("/")[2]
+    if name and name not in keys:
+        keys.append(name)
+    return keys
 
 
-def list_epub_sections(epub_file: Path) -> list[EpubSection]:
-    sections: list[EpubSection] = []
-    with zipfile.ZipFile(epub_file, "r") as zf:
+@dataclass(frozen=True)
+class _EpubPackage:
+    """Parsed OPF shared by every caller of ``_epub_package``.
+
+    Frozen only guards the fields; ``root``, ``manifest_items`` and ``items_by_id``
+    are the cached objects themselves and must not be mutated.
+    """
+
+    opf_path: str
+    root: LXML_ET._Element
+    manifest_items: list[_ZipManifestItem]
+    items_by_id: dict[str, _ZipManifestItem]
+
+
+@lru_cache(maxsize=32)
+def _epub_package_cached(path: str, mtime_ns: int, size: int) -> _EpubPackage:
+    with zipfile.ZipFile(path, "r") as zf:
+        opf_path, root = _opf_root_from_zip(zf)
+    manifest_items, items_by_id = _manifest_from_opf(opf_path, root)
+    return _EpubPackage(opf_path=opf_path, root=root, manifest_items=manifest_items, items_by_id=items_by_id)
+
+
+def _epub_package(epub_file: Path) -> _EpubPackage:
+    # Import, cover refresh, preview and search all start from the same parsed OPF;
+    # the mtime/size key drops it as soon as the file is rewritten. Read-only.
+    stat = epub_file.stat()
+    return _epub_package_cached(str(epub_file), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=64)
+def _epub_spine_cached(path: str, mtime_ns: int, size: int) -> tuple[tuple[_ZipManifestItem, ...], dict[str, str]]:
+    package = _epub_package_cached(path, mtime_ns, size)
+    with zipfile.ZipFile(path, "r") as zf:
+        toc_titles = _toc_title_index_from_zip(zf, _zip_member_index(zf), package.manifest_items)
+    spine_items = _spine_document_items(package.root, package.manifest_items, package.items_by_id)
+    return tuple(spine_items), toc_titles
+
+
+def _epub_spine(epub_file: Path) -> tuple[tuple[_ZipManifestItem, ...], dict[str, str]]:
+    # Spine and TOC titles are parsed once per file version and shared by section
+    # listing and search; callers must treat the cached items as read-only.
+    stat = epub_file.stat()
+    return _epub_spine_cached(str(epub_file), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=64)
+def _epub_sections_cached(path: str, mtime_ns: int, size: int) -> tuple[tuple[str, str], ...]:
+    spine_items, toc_titles = _epub_spine_cached(path, mtime_ns, size)
+    sections: list[tuple[str, str]] = []
+    with zipfile.ZipFile(path, "r") as zf:
         index = _zip_member_index(zf)
-        opf_path, root = _opf_root_from_zip(zf, index)
-        manifest_items, items_by_id = _manifest_from_opf(opf_path, root)
-        toc_titles = _toc_title_index_from_zip(zf, index, manifest_items)
-        for idx, item in enumerate(_spine_document_items(root, manifest_items, items_by_id)):
+        for idx, item in enumerate(spine_items):
             title = _resolve_document_title(zf, index, item, toc_titles, idx)
-            sections.append(EpubSection(title=title, item_path=item.member_path))
-    return sections
+            sections.append((title, item.member_path))
+    return tuple(sections)
+
+
+def list_epub_sections(epub_file: Path) -> list[EpubSection]:
+    # Section listing and item preview hit the same file back to back; the
+    # mtime/size key drops the cached entry as soon as the EPUB is rewritten.
+    stat = epub_file.stat()
+    cached = _epub_sections_cached(str(epub_file), stat.st_mtime_ns, stat.st_size)
+    return [EpubSection(title=title, item_path=item_path) for title, item_path in cached]
 
 
 def iter_epub_section_documents(epub_file: Path) -> Iterable[EpubSectionDocument]:
     """Iterate spine document payloads lazily for search/analysis."""
+    spine_items, toc_titles = _epub_spine(epub_file)
     with zipfile.ZipFile(epub_file, "r") as zf:
         index = _zip_member_index(zf)
-        opf_path, root = _opf_root_from_zip(zf, index)
-        manifest_items, items_by_id = _manifest_from_opf(opf_path, root)
-        toc_titles = _toc_title_index_from_zip(zf, index, manifest_items)
-        for idx, item in enumerate(_spine_document_items(root, manifest_items, items_by_id)):
+        for idx, item in enumerate(spine_items):
             content = _read_member_bytes(zf, index, item.member_path)
             if content is None:
                 continue
@@ -1737,33 +2270,109 @@ def list_epub_section_documents(epub_file: Path) -> list[EpubSectionDocument]:
     return list(iter_epub_section_documents(epub_file))
 
 
+@lru_cache(maxsize=32)
+def _manifest_media_types_cached(path: str, mtime_ns: int, size: int) -> dict[str, str]:
+    media_types: dict[str, str] = {}
+    for item in _epub_package_cached(path, mtime_ns, size).manifest_items:
+        if item.member_path and item.media_type:
+            media_types.setdefault(item.member_path, item.media_type)
+    return media_types
+
+
+def _manifest_media_types(epub_file: Path) -> dict[str, str]:
+    # Keyed on mtime/size so a rewritten EPUB never serves a stale manifest.
+    stat = epub_file.stat()
+    return _manifest_media_types_cached(str(epub_file), stat.st_mtime_ns, stat.st_size)
+
+
+@dataclass
+class _PreviewReader:
+    zf: zipfile.ZipFile
+    index: Optional[_ZipMemberIndex] = None
+
+
+# Idle readers only: a request checks one out, reads without holding the lock, then returns it.
+_preview_readers: dict[tuple[str, int, int], _PreviewReader] = {}
+_preview_readers_lock = threading.Lock()
+
+
+def _discard_preview_readers(path: str, keep: Optional[tuple[str, int, int]] = None) -> None:
+    # A rewritten or deleted book must not keep its old archive (and inode) open.
+    with _preview_readers_lock:
+        stale = [_preview_readers.pop(key) for key in list(_preview_readers) if key[0] == path and key != keep]
+    for reader in stale:
+        reader.zf.close()
+
+
+def _checkout_preview_reader(epub_file: Path) -> tuple[tuple[str, int, int], _PreviewReader]:
+    path = str(epub_file)
+    try:
+        stat = epub_file.stat()
+    except FileNotFoundError:
+        _discard_preview_readers(path)
+        raise
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _preview_readers_lock:
+        reader = _preview_readers.pop(key, None)
+    _discard_preview_readers(path, keep=key)
+    if reader is None:
+        reader = _PreviewReader(zipfile.ZipFile(epub_file, "r"))
+    return key, reader
+
+
+def _checkin_preview_reader(key: tuple[str, int, int], reader: _PreviewReader) -> None:
+    evicted: list[_PreviewReader] = []
+    with _preview_readers_lock:
+        if key in _preview_readers:
+            # A concurrent request pooled its own reader for this version first.
+            evicted.append(reader)
+        else:
+            while len(_preview_readers) >= PREVIEW_READER_POOL_SIZE:
+                evicted.append(_preview_readers.pop(next(iter(_preview_readers))))
+            _preview_readers[key] = reader
+    for stale in evicted:
+        stale.zf.close()
+
+
+def _read_preview_member(epub_file: Path, item_path: str) -> tuple[str, bytes]:
+    # Opening the zip re-parses the whole central directory, which dominates a
+    # chapter fetch on large books; keep a few readers open per (path, mtime, size).
+    key, reader = _checkout_preview_reader(epub_file)
+    try:
+        canonical_target = _canonical_zip_member(item_path)
+        if canonical_target and canonical_target in reader.zf.NameToInfo:
+            # Preview links carry the exact member path; skip indexing every member.
+            actual_target = canonical_target
+        else:
+            if reader.index is None:
+                reader.index = _zip_member_index(reader.zf)
+            target = _locate_zip_member(reader.index, item_path)
+            if not target:
+                raise FileNotFoundError(item_path)
+            canonical_target, actual_target = target
+        return canonical_target, reader.zf.read(actual_target)
+    finally:
+        _checkin_preview_reader(key, reader)
+
+
 def load_epub_item(epub_file: Path, item_path: str, base_href: str) -> tuple[bytes, str]:
-    with zipfile.ZipFile(epub_file, "r") as zf:
-        index = _zip_member_index(zf)
-        target = _locate_zip_member(index, item_path)
-        if not target:
-            raise FileNotFoundError(item_path)
-        canonical_target, actual_target = target
-        content = zf.read(actual_target)
-
-        media_type = _guess_media_type(canonical_target)
-        if media_type == "application/octet-stream":
-            try:
-                opf_path, root = _opf_root_from_zip(zf, index)
-                manifest_items, _ = _manifest_from_opf(opf_path, root)
-                for manifest_item in manifest_items:
-                    if manifest_item.member_path == canonical_target and manifest_item.media_type:
-                        media_type = manifest_item.media_type
-                        break
-            except Exception:
-                pass
+    canonical_target, content = _read_preview_member(epub_file, item_path)
+
+    media_type = _guess_media_type(canonical_target)
+    if media_type == "application/octet-stream":
+        try:
+            media_type = _manifest_media_types(epub_file).get(canonical_target) or media_type
+        except Exception:
+            pass
 
     if _is_document_media_type(media_type):
-        text = content.decode("utf-8", errors="replace")
-        text = _strip_scripts(text)
-        text = _inject_base(text, base_href)
-        content = text.encode("utf-8")
-        media_type = "text/html; charset=utf-8"
+        charset = _declared_html_charset(content)
+        if charset.startswith(("utf-16", "utf-32")):
+            # The byte-level rewrite assumes an ASCII-compatible encoding.
+            content = content.decode(charset, errors="replace").encode("utf-8")
+            charset = "utf-8"
+        content = _prepare_preview_html(content, base_href)
+        media_type = f"text/html; charset={charset}"
     return content, media_type
 
 
@@ -1775,6 +2384,12 @@ def epub_base_href(base_prefix: str, item_path: str) -> str:
     If we always use "/.../epub/" as the base, "../Images/..." escapes the epub path.
     """
 
+    return _epub_base_href_cached(base_prefix, item_path)
+
+
+@lru_cache(maxsize=4096)
+def _epub_base_href_cached(base_prefix: str, item_path: str) -> str:
+    # Every asset request of a previewed chapter resolves the same inputs again.
     prefix = base_prefix if base_prefix.endswith("/") else f"{base_prefix}/"
     safe = Path(item_path.lstrip("/"))
     parent = safe.parent.as_posix()
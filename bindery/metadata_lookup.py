@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import json
 import re
+import threading
+import time
 import urllib.parse
 import urllib.request
+import zlib
 from dataclasses import dataclass, field
+from functools import lru_cache
 from html import unescape
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from lxml import etree, html as lxml_html
 
@@ -15,7 +19,79 @@ USER_AGENT = (
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/123.0.0.0 Safari/537.36"
 )
-DESCRIPTION_XPATH = "//div[@id='link-report']//div[@class='intro']"
+# Book pages are far below this; anything larger is truncated before parsing.
+MAX_FETCH_BYTES = 2 * 1024 * 1024
+FETCH_CACHE_SIZE = 32
+FETCH_CACHE_TTL = 300.0
+DESCRIPTION_XPATH = etree.XPath("//div[@id='link-report']//div[@class='intro']")
+AMAZON_DESCRIPTION_XPATHS = tuple(
+    etree.XPath(expr)
+    for expr in (
+        "//*[@id='bookDescription_feature_div']//span[contains(@class,'a-expander-partial-collapse-content')]",
+        "//*[@id='bookDescription_feature_div']//div[contains(@class,'a-expander-content')]",
+        "//*[@id='bookDescription_feature_div']",
+    )
+)
+LD_JSON_XPATH = etree.XPath(
+    "//script[translate(@type, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')='application/ld+json']"
+)
+AMAZON_BULLETS_XPATH = etree.XPath("//*[@id='feature-bullets']//span[contains(@class,'a-list-item')]")
+
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+DATE_RE = re.compile(r"\d{4}(?:-\d{1,2}(?:-\d{1,2})?)?")
+ISBN_RE = re.compile(r"[0-9Xx-]{10,20}")
+HTTP_URL_RE = re.compile(r"^https?://", re.IGNORECASE)
+TAG_SPLIT_RE = re.compile(r"[，,;/|]")
+META_DESCRIPTION_RE = re.compile(
+    r"<meta[^>]+name=[\"']description[\"'][^>]+content=[\"'](.*?)[\"'][^>]*>", re.IGNORECASE | re.DOTALL
+)
+ANCHOR_TEXT_RE = re.compile(r"<a[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+CLASS_ATTR_RE = re.compile(r"class=[\"']([^\"']*)[\"']", re.IGNORECASE | re.DOTALL)
+HREF_ATTR_RE = re.compile(r"href=[\"'](.*?)[\"']", re.IGNORECASE | re.DOTALL)
+
+DOUBAN_TAG_LINK_RE = re.compile(
+    r"<a[^>]*class=[\"'][^\"']*\btag\b[^\"']*[\"'][^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL
+)
+DOUBAN_CRITERIA_RE = re.compile(r"criteria\s*=\s*([\"'])(.*?)\1", re.IGNORECASE | re.DOTALL)
+# "7:<tag>" entries of the '|'-separated criteria string.
+DOUBAN_CRITERIA_TAG_RE = re.compile(r"(?:^|\|)\s*7:([^|]*)")
+DOUBAN_NBG_CLASS_RE = re.compile(r"(^|\s)nbg(\s|$)", re.IGNORECASE)
+# Only anchors mentioning "nbg" anywhere in their attributes can carry the cover class.
+DOUBAN_NBG_ANCHOR_RE = re.compile(r"<a\b((?=[^>]*nbg)[^>]*)>", re.IGNORECASE | re.DOTALL)
+DOUBAN_OG_IMAGE_RE = re.compile(
+    r"<meta[^>]+property=[\"']og:image[\"'][^>]+content=[\"'](.*?)[\"'][^>]*>", re.IGNORECASE | re.DOTALL
+)
+DOUBAN_PUBLISHER_RE = re.compile(
+    r"出版社[:：]\s*(.+?)(?=\s+(?:作者|原作名|副标题|译者|出版年|页数|定价|装帧|丛书|ISBN|统一书号|出品方|品牌方)[:：]|$)"
+)
+DOUBAN_ISBN_RE = re.compile(r"ISBN[:：]\s*([0-9Xx-]{10,20})")
+DOUBAN_PUBLISHED_RE = re.compile(r"出版年[:：]\s*([0-9-]{4,10})")
+
+AMAZON_PRODUCT_TITLE_RE = re.compile(
+    r'<span[^>]+id=["\']productTitle["\'][^>]*>(.*?)</span>', re.IGNORECASE | re.DOTALL
+)
+AMAZON_META_TITLE_RE = re.compile(
+    r'<meta[^>]+name=["\']title["\'][^>]+content=["\'](.*?)["\'][^>]*>', re.IGNORECASE | re.DOTALL
+)
+AMAZON_TITLE_PREFIX_RE = re.compile(r"Amazon\.com[:：]\s*(.+?)(?:\s*:\s*[0-9Xx-]{10,20}\b|$)", re.IGNORECASE)
+AMAZON_BYLINE_RE = re.compile(r'<div[^>]+id=["\']bylineInfo["\'][^>]*>(.*?)</div>', re.IGNORECASE | re.DOTALL)
+AMAZON_PUBLISHER_RE = re.compile(r"Publisher[:：]\s*([^\n\r]+?)\s{2,}")
+AMAZON_ISBN_RE = re.compile(r"ISBN-1[03][:：]\s*([0-9Xx-]{10,20})")
+AMAZON_DATE_RE = re.compile(r"Publication date[:：]\s*([0-9A-Za-z,\- ]+)")
+AMAZON_LANGUAGE_RE = re.compile(r"Language[:：]\s*([A-Za-z\- ]+)")
+AMAZON_ASIN_PATH_RE = re.compile(r"/dp/([A-Z0-9]{10})")
+AMAZON_ASIN_ATTR_RE = re.compile(r"data-asin=[\"']([A-Z0-9]{10})[\"']")
+
+FRAGMENT_TAG_RE = re.compile(
+    r"(<\s*br\s*/?\s*>)|(<\s*li[^>]*>)|(</\s*(?:p|div|li|h[1-6]|tr)\s*>)|<[^>]+>", re.IGNORECASE
+)
+SPACES_AROUND_NEWLINE_RE = re.compile(r"[ \t]*\n[ \t]*")
+EXTRA_NEWLINES_RE = re.compile(r"\n{3,}")
+INLINE_SPACES_RE = re.compile(r"[ \t]{2,}")
+
+NAME_NOISE_RE = re.compile(r"[^0-9a-zA-Z\u4e00-\u9fff]+")
+AUTHOR_TOKEN_RE = re.compile(r"[0-9a-zA-Z]+|[\u4e00-\u9fff]+")
+AUTHOR_SPLIT_RE = re.compile(r"\s*(?:/|,|，|;|；|&|＆|\||、)\s*")
 
 
 @dataclass
@@ -36,8 +112,11 @@ def _clean_text(value: Optional[str]) -> Optional[str]:
     if not value:
         return None
     value = unescape(value)
-    value = re.sub(r"<[^>]+>", " ", value)
-    value = re.sub(r"\s+", " ", value).strip()
+    # Most values (JSON-LD fields, suggest API strings) carry no markup at all.
+    if "<" in value:
+        value = HTML_TAG_RE.sub(" ", value)
+    # str.split() and \s agree on what counts as whitespace.
+    value = " ".join(value.split())
     return value or None
 
 
@@ -45,7 +124,7 @@ def _clean_date(value: Optional[str]) -> Optional[str]:
     cleaned = _clean_text(value)
     if not cleaned:
         return None
-    match = re.search(r"\d{4}(?:-\d{1,2}(?:-\d{1,2})?)?", cleaned)
+    match = DATE_RE.search(cleaned)
     return match.group(0) if match else cleaned
 
 
@@ -53,7 +132,7 @@ def _clean_isbn(value: Optional[str]) -> Optional[str]:
     cleaned = _clean_text(value)
     if not cleaned:
         return None
-    match = re.search(r"[0-9Xx-]{10,20}", cleaned)
+    match = ISBN_RE.search(cleaned)
     return match.group(0).upper() if match else cleaned
 
 
@@ -65,7 +144,7 @@ def _clean_url(value: Optional[str]) -> Optional[str]:
         return None
     if url.startswith("//"):
         url = "https:" + url
-    if not re.match(r"^https?://", url, flags=re.IGNORECASE):
+    if not HTTP_URL_RE.match(url):
         return None
     return url
 
@@ -74,67 +153,33 @@ def _split_tags(raw: Optional[str]) -> list[str]:
     cleaned = _clean_text(raw)
     if not cleaned:
         return []
-    parts = re.split(r"[，,;/|]", cleaned)
-    seen: set[str] = set()
-    tags: list[str] = []
-    for item in parts:
-        value = item.strip()
-        if not value or value in seen:
-            continue
-        seen.add(value)
-        tags.append(value)
-    return tags
+    return list(dict.fromkeys(filter(None, (item.strip() for item in TAG_SPLIT_RE.split(cleaned)))))
 
 
 def _extract_douban_tag_links(html: str) -> list[str]:
-    tags: list[str] = []
-    seen: set[str] = set()
-    for match in re.finditer(
-        r"<a[^>]*class=[\"'][^\"']*\btag\b[^\"']*[\"'][^>]*>(.*?)</a>",
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    ):
-        value = _clean_text(match.group(1))
-        if not value or value in seen:
-            continue
-        seen.add(value)
-        tags.append(value)
-    return tags
+    values = (_clean_text(match.group(1)) for match in DOUBAN_TAG_LINK_RE.finditer(html))
+    return list(dict.fromkeys(filter(None, values)))
 
 
 def _extract_douban_criteria_tags(html: str) -> list[str]:
-    match = re.search(
-        r"criteria\s*=\s*([\"'])(.*?)\1",
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
+    match = DOUBAN_CRITERIA_RE.search(html)
     if not match:
         return []
     criteria = unescape(match.group(2))
-    tags: list[str] = []
-    seen: set[str] = set()
-    for item in criteria.split("|"):
-        item = item.strip()
-        if not item.startswith("7:"):
-            continue
-        value = _clean_text(item[2:].strip())
-        if not value or value in seen:
-            continue
-        seen.add(value)
-        tags.append(value)
-    return tags
+    values = (_clean_text(item) for item in DOUBAN_CRITERIA_TAG_RE.findall(criteria))
+    return list(dict.fromkeys(filter(None, values)))
 
 
 def _extract_douban_cover_href(html: str) -> Optional[str]:
-    for match in re.finditer(r"<a\b([^>]*)>", html, flags=re.IGNORECASE | re.DOTALL):
+    for match in DOUBAN_NBG_ANCHOR_RE.finditer(html):
         attrs = match.group(1)
-        class_match = re.search(r"class=[\"']([^\"']*)[\"']", attrs, flags=re.IGNORECASE | re.DOTALL)
+        class_match = CLASS_ATTR_RE.search(attrs)
         if not class_match:
             continue
         class_value = _clean_text(class_match.group(1)) or ""
-        if not re.search(r"(^|\s)nbg(\s|$)", class_value, flags=re.IGNORECASE):
+        if not DOUBAN_NBG_CLASS_RE.search(class_value):
             continue
-        href_match = re.search(r"href=[\"'](.*?)[\"']", attrs, flags=re.IGNORECASE | re.DOTALL)
+        href_match = HREF_ATTR_RE.search(attrs)
         if not href_match:
             continue
         href = _clean_url(href_match.group(1))
@@ -193,81 +238,73 @@ def _pick_image_url(value: Any) -> Optional[str]:
     return None
 
 
-def _extract_amazon_rpi_value(html: str, key: str) -> Optional[str]:
-    pattern = (
+@lru_cache(maxsize=32)
+def _amazon_rpi_pattern(key: str) -> re.Pattern[str]:
+    return re.compile(
         r'<div[^>]+id=["\']rpi-attribute-'
         + re.escape(key)
         + r'["\'][^>]*>.*?'
-        + r'<div[^>]+rpi-attribute-value[^>]*>\s*<span>(.*?)</span>'
+        + r'<div[^>]+rpi-attribute-value[^>]*>\s*<span>(.*?)</span>',
+        re.IGNORECASE | re.DOTALL,
     )
-    match = re.search(pattern, html, flags=re.IGNORECASE | re.DOTALL)
+
+
+def _extract_amazon_rpi_value(html: str, key: str) -> Optional[str]:
+    # Find the id literally, then run the tag pattern from the enclosing "<" only.
+    marker = html.find("rpi-attribute-" + key)
+    if marker < 0:
+        return None
+    match = _amazon_rpi_pattern(key).search(html, max(html.rfind("<", 0, marker), 0))
     if not match:
         return None
     return _clean_text(match.group(1))
 
 
 def _extract_amazon_product_title(html: str) -> Optional[str]:
-    match = re.search(
-        r'<span[^>]+id=["\']productTitle["\'][^>]*>(.*?)</span>',
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
+    # Literal pre-checks skip the backtracking tag scans on pages without the block.
+    match = AMAZON_PRODUCT_TITLE_RE.search(html) if "productTitle" in html else None
     if match:
         return _clean_text(match.group(1))
 
-    meta_match = re.search(
-        r'<meta[^>]+name=["\']title["\'][^>]+content=["\'](.*?)["\'][^>]*>',
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
+    meta_match = AMAZON_META_TITLE_RE.search(html)
     if not meta_match:
         return None
     raw = _clean_text(meta_match.group(1)) or ""
     # e.g. "Amazon.com: Pirates Past Noon ...: 8601...: Author: 图书"
-    title_match = re.search(r"Amazon\.com[:：]\s*(.+?)(?:\s*:\s*[0-9Xx-]{10,20}\b|$)", raw, flags=re.IGNORECASE)
+    title_match = AMAZON_TITLE_PREFIX_RE.search(raw)
     if title_match:
         return _clean_text(title_match.group(1))
     return raw or None
 
 
 def _extract_amazon_byline_authors(html: str) -> Optional[str]:
-    block_match = re.search(
-        r'<div[^>]+id=["\']bylineInfo["\'][^>]*>(.*?)</div>',
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
+    if "bylineInfo" not in html:
+        return None
+    block_match = AMAZON_BYLINE_RE.search(html)
     if not block_match:
         return None
     block = block_match.group(1)
-    names: list[str] = []
-    seen: set[str] = set()
-    for match in re.finditer(r"<a[^>]*>(.*?)</a>", block, flags=re.IGNORECASE | re.DOTALL):
-        name = _clean_text(match.group(1))
-        if not name or name in seen:
-            continue
-        seen.add(name)
-        names.append(name)
+    values = (_clean_text(match.group(1)) for match in ANCHOR_TEXT_RE.finditer(block))
+    names = list(dict.fromkeys(filter(None, values)))
     if not names:
         return None
     return ", ".join(names)
 
 
-def _extract_amazon_description(html: str) -> Optional[str]:
+def _parse_html(html: str) -> Optional[lxml_html.HtmlElement]:
+    # One tree per fetched page, shared by every extractor that needs the DOM.
     try:
-        document = lxml_html.fromstring(html)
+        return lxml_html.fromstring(html)
     except (etree.ParserError, ValueError):
         return None
 
+
+def _extract_amazon_description(document: lxml_html.HtmlElement) -> Optional[str]:
     candidates: list[str] = []
     seen: set[str] = set()
 
-    for xpath in (
-        "//*[@id='bookDescription_feature_div']//span[contains(@class,'a-expander-partial-collapse-content')]",
-        "//*[@id='bookDescription_feature_div']//div[contains(@class,'a-expander-content')]",
-        "//*[@id='bookDescription_feature_div']",
-    ):
-        nodes = document.xpath(xpath)
-        for node in nodes:
+    for xpath in AMAZON_DESCRIPTION_XPATHS:
+        for node in xpath(document):
             if not isinstance(node, etree._Element):
                 continue
             text = _clean_text(node.text_content())
@@ -284,7 +321,7 @@ def _extract_amazon_description(html: str) -> Optional[str]:
 
     bullets: list[str] = []
     bullet_seen: set[str] = set()
-    for node in document.xpath("//*[@id='feature-bullets']//span[contains(@class,'a-list-item')]"):
+    for node in AMAZON_BULLETS_XPATH(document):
         if not isinstance(node, etree._Element):
             continue
         text = _clean_text(node.text_content())
@@ -301,29 +338,31 @@ def _extract_amazon_description(html: str) -> Optional[str]:
     return None
 
 
+def _fragment_tag_replacement(match: re.Match[str]) -> str:
+    if match.group(1):
+        return "\n"
+    if match.group(2):
+        return "- "
+    if match.group(3):
+        return "\n\n"
+    return ""
+
+
 def _html_fragment_to_markdownish(raw_html: str) -> Optional[str]:
     if not raw_html:
         return None
-    text = raw_html
-    text = re.sub(r"<\s*br\s*/?\s*>", "\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"<\s*li[^>]*>", "- ", text, flags=re.IGNORECASE)
-    text = re.sub(r"</\s*(p|div|li|h[1-6]|tr)\s*>", "\n\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"<[^>]+>", "", text)
+    # <br>, <li>, block closers and any other tag are rewritten in one pass.
+    text = FRAGMENT_TAG_RE.sub(_fragment_tag_replacement, raw_html)
     text = unescape(text)
     text = text.replace("\r\n", "\n")
-    text = re.sub(r"[ \t]+\n", "\n", text)
-    text = re.sub(r"\n[ \t]+", "\n", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]{2,}", " ", text)
+    text = SPACES_AROUND_NEWLINE_RE.sub("\n", text)
+    text = EXTRA_NEWLINES_RE.sub("\n\n", text)
+    text = INLINE_SPACES_RE.sub(" ", text)
     return text.strip() or None
 
 
-def _extract_douban_intro_description(html: str) -> Optional[str]:
-    try:
-        document = lxml_html.fromstring(html)
-    except (etree.ParserError, ValueError):
-        return None
-    description_nodes = document.xpath(DESCRIPTION_XPATH)
+def _extract_douban_intro_description(document: lxml_html.HtmlElement) -> Optional[str]:
+    description_nodes = DESCRIPTION_XPATH(document)
     if not description_nodes:
         return None
     node = description_nodes[-1]
@@ -333,31 +372,33 @@ def _extract_douban_intro_description(html: str) -> Optional[str]:
     return _html_fragment_to_markdownish(raw)
 
 
-def _iter_ld_json_objects(html: str) -> list[dict[str, Any]]:
-    objects: list[dict[str, Any]] = []
-    for match in re.finditer(
-        r"<script[^>]+type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    ):
-        raw = match.group(1).strip()
+def _iter_ld_json_objects(document: Optional[lxml_html.HtmlElement]) -> Iterator[dict[str, Any]]:
+    # Lazy so callers that stop at the first Book skip decoding the remaining blocks.
+    if document is None:
+        return
+    for script in LD_JSON_XPATH(document):
+        raw = (script.text or "").strip()
         if not raw:
             continue
         try:
-            data = json.loads(unescape(raw))
+            data = json.loads(raw)
         except json.JSONDecodeError:
-            continue
+            # Values are unescaped by _clean_text later; only entity-escaped blocks need it here.
+            try:
+                data = json.loads(unescape(raw))
+            except json.JSONDecodeError:
+                continue
         if isinstance(data, dict):
-            objects.append(data)
+            yield data
         elif isinstance(data, list):
-            objects.extend(item for item in data if isinstance(item, dict))
-    return objects
+            yield from (item for item in data if isinstance(item, dict))
 
 
 def parse_douban_subject_html(html: str) -> LookupMetadata:
     metadata = LookupMetadata(source="douban")
+    document = _parse_html(html)
     keywords_tags: list[str] = []
-    for obj in _iter_ld_json_objects(html):
+    for obj in _iter_ld_json_objects(document):
         obj_type = obj.get("@type")
         type_names = obj_type if isinstance(obj_type, list) else [obj_type]
         if "Book" not in type_names:
@@ -378,7 +419,7 @@ def parse_douban_subject_html(html: str) -> LookupMetadata:
             keywords_tags = tags
         break
 
-    intro_description = _extract_douban_intro_description(html)
+    intro_description = _extract_douban_intro_description(document) if document is not None else None
     if intro_description:
         metadata.description = intro_description
 
@@ -386,11 +427,7 @@ def parse_douban_subject_html(html: str) -> LookupMetadata:
     if cover_from_nbg:
         metadata.cover_url = cover_from_nbg
     else:
-        og_image_match = re.search(
-            r"<meta[^>]+property=[\"']og:image[\"'][^>]+content=[\"'](.*?)[\"'][^>]*>",
-            html,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
+        og_image_match = DOUBAN_OG_IMAGE_RE.search(html)
         if og_image_match:
             metadata.cover_url = _clean_url(og_image_match.group(1)) or metadata.cover_url
 
@@ -405,37 +442,32 @@ def parse_douban_subject_html(html: str) -> LookupMetadata:
             metadata.tags = keywords_tags
 
     if not metadata.description:
-        meta_match = re.search(
-            r"<meta[^>]+name=[\"']description[\"'][^>]+content=[\"'](.*?)[\"'][^>]*>",
-            html,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
+        meta_match = META_DESCRIPTION_RE.search(html)
         if meta_match:
             metadata.description = _clean_text(meta_match.group(1))
 
-    page_text = _clean_text(html) or ""
-    if not metadata.publisher:
-        publisher_match = re.search(
-            r"出版社[:：]\s*(.+?)(?=\s+(?:作者|原作名|副标题|译者|出版年|页数|定价|装帧|丛书|ISBN|统一书号|出品方|品牌方)[:：]|$)",
-            page_text,
-        )
-        if publisher_match:
-            metadata.publisher = _clean_text(publisher_match.group(1))
-    if not metadata.isbn:
-        isbn_match = re.search(r"ISBN[:：]\s*([0-9Xx-]{10,20})", page_text)
-        if isbn_match:
-            metadata.isbn = _clean_isbn(isbn_match.group(1))
-    if not metadata.published:
-        published_match = re.search(r"出版年[:：]\s*([0-9-]{4,10})", page_text)
-        if published_match:
-            metadata.published = _clean_date(published_match.group(1))
+    if not (metadata.publisher and metadata.isbn and metadata.published):
+        page_text = _clean_text(html) or ""
+        if not metadata.publisher:
+            publisher_match = DOUBAN_PUBLISHER_RE.search(page_text)
+            if publisher_match:
+                metadata.publisher = _clean_text(publisher_match.group(1))
+        if not metadata.isbn:
+            isbn_match = DOUBAN_ISBN_RE.search(page_text)
+            if isbn_match:
+                metadata.isbn = _clean_isbn(isbn_match.group(1))
+        if not metadata.published:
+            published_match = DOUBAN_PUBLISHED_RE.search(page_text)
+            if published_match:
+                metadata.published = _clean_date(published_match.group(1))
 
     return metadata
 
 
 def parse_amazon_product_html(html: str) -> LookupMetadata:
     metadata = LookupMetadata(source="amazon")
-    for obj in _iter_ld_json_objects(html):
+    document = _parse_html(html)
+    for obj in _iter_ld_json_objects(document):
         obj_type = obj.get("@type")
         type_names = obj_type if isinstance(obj_type, list) else [obj_type]
         if "Book" not in type_names and "Product" not in type_names:
@@ -460,8 +492,8 @@ def parse_amazon_product_html(html: str) -> LookupMetadata:
         metadata.title = _extract_amazon_product_title(html) or metadata.title
     if not metadata.author:
         metadata.author = _extract_amazon_byline_authors(html) or metadata.author
-    if not metadata.description:
-        metadata.description = _extract_amazon_description(html) or metadata.description
+    if not metadata.description and document is not None:
+        metadata.description = _extract_amazon_description(document) or metadata.description
     if not metadata.publisher:
         metadata.publisher = _extract_amazon_rpi_value(html, "book_details-publisher") or metadata.publisher
     if not metadata.published:
@@ -473,29 +505,27 @@ def parse_amazon_product_html(html: str) -> LookupMetadata:
         isbn10 = _clean_isbn(_extract_amazon_rpi_value(html, "book_details-isbn10"))
         metadata.isbn = isbn13 or isbn10 or metadata.isbn
 
-    page_text = _clean_text(html) or ""
-    if not metadata.publisher:
-        publisher_match = re.search(r"Publisher[:：]\s*([^\n\r]+?)\s{2,}", page_text)
-        if publisher_match:
-            metadata.publisher = _clean_text(publisher_match.group(1))
-    if not metadata.isbn:
-        isbn_match = re.search(r"ISBN-1[03][:：]\s*([0-9Xx-]{10,20})", page_text)
-        if isbn_match:
-            metadata.isbn = _clean_isbn(isbn_match.group(1))
-    if not metadata.published:
-        date_match = re.search(r"Publication date[:：]\s*([0-9A-Za-z,\- ]+)", page_text)
-        if date_match:
-            metadata.published = _clean_date(date_match.group(1))
-    if not metadata.language:
-        language_match = re.search(r"Language[:：]\s*([A-Za-z\- ]+)", page_text)
-        if language_match:
-            metadata.language = _clean_text(language_match.group(1))
+    # The flattened page text is only needed for fields JSON-LD and the detail bullets missed.
+    if not (metadata.publisher and metadata.isbn and metadata.published and metadata.language):
+        page_text = _clean_text(html) or ""
+        if not metadata.publisher:
+            publisher_match = AMAZON_PUBLISHER_RE.search(page_text)
+            if publisher_match:
+                metadata.publisher = _clean_text(publisher_match.group(1))
+        if not metadata.isbn:
+            isbn_match = AMAZON_ISBN_RE.search(page_text)
+            if isbn_match:
+                metadata.isbn = _clean_isbn(isbn_match.group(1))
+        if not metadata.published:
+            date_match = AMAZON_DATE_RE.search(page_text)
+            if date_match:
+                metadata.published = _clean_date(date_match.group(1))
+        if not metadata.language:
+            language_match = AMAZON_LANGUAGE_RE.search(page_text)
+            if language_match:
+                metadata.language = _clean_text(language_match.group(1))
     if not metadata.description:
-        meta_match = re.search(
-            r"<meta[^>]+name=[\"']description[\"'][^>]+content=[\"'](.*?)[\"'][^>]*>",
-            html,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
+        meta_match = META_DESCRIPTION_RE.search(html)
         if meta_match:
             desc = _clean_text(meta_match.group(1))
             if desc and not desc.lower().startswith("amazon.com:"):
@@ -504,63 +534,109 @@ def parse_amazon_product_html(html: str) -> LookupMetadata:
     return metadata
 
 
-def _fetch_text(url: str, timeout: float = 8.0) -> str:
+# Retried lookups and books sharing a subject reuse recent parsed results; treat them as read-only.
+_fetch_cache: dict[str, tuple[float, Any]] = {}
+_fetch_cache_lock = threading.Lock()
+
+
+def _inflate(data: bytes, wbits: int) -> bytes:
+    return zlib.decompressobj(wbits).decompress(data, MAX_FETCH_BYTES)
+
+
+def _decode_content(data: bytes, encoding: str) -> bytes:
+    if encoding in {"gzip", "x-gzip"}:
+        return _inflate(data, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return _inflate(data, zlib.MAX_WBITS)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header.
+            return _inflate(data, -zlib.MAX_WBITS)
+    return data
+
+
+def _fetch(url: str, accept: str, timeout: float) -> str:
     req = urllib.request.Request(
         url,
         headers={
             "User-Agent": USER_AGENT,
-            "Accept": "text/html,application/json;q=0.9,*/*;q=0.8",
+            "Accept": accept,
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
         },
     )
     with urllib.request.urlopen(req, timeout=timeout) as response:
-        data = response.read()
+        data = response.read(MAX_FETCH_BYTES)
         charset = response.headers.get_content_charset() or "utf-8"
-    return data.decode(charset, errors="replace")
+        encoding = (response.headers.get("Content-Encoding") or "").strip().lower()
+    return _decode_content(data, encoding).decode(charset, errors="replace")
+
+
+def _cached_lookup(key: str) -> Any:
+    now = time.monotonic()
+    with _fetch_cache_lock:
+        cached = _fetch_cache.pop(key, None)
+        if cached is None or now - cached[0] >= FETCH_CACHE_TTL:
+            return None
+        _fetch_cache[key] = cached
+        return cached[1]
+
+
+def _store_lookup(key: str, value: Any) -> None:
+    # Only validated results are stored: a captcha page or broken JSON must be refetched on retry.
+    now = time.monotonic()
+    with _fetch_cache_lock:
+        _fetch_cache.pop(key, None)
+        while len(_fetch_cache) >= FETCH_CACHE_SIZE:
+            _fetch_cache.pop(next(iter(_fetch_cache)))
+        _fetch_cache[key] = (now, value)
+
+
+def _fetch_text(url: str, timeout: float = 8.0) -> str:
+    return _fetch(url, "text/html,application/json;q=0.9,*/*;q=0.8", timeout)
 
 
 def _fetch_json(url: str, timeout: float = 8.0) -> Any:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": USER_AGENT,
-            "Accept": "application/json,text/plain,*/*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        },
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as response:
-        data = response.read()
-        charset = response.headers.get_content_charset() or "utf-8"
-    return json.loads(data.decode(charset, errors="replace"))
+    data = _cached_lookup(url)
+    if data is None:
+        data = json.loads(_fetch(url, "application/json,text/plain,*/*", timeout))
+        _store_lookup(url, data)
+    return data
 
 
+@lru_cache(maxsize=128)
 def _normalize_title(value: Optional[str]) -> str:
     cleaned = _clean_text(value) or ""
-    return re.sub(r"[^0-9a-zA-Z\u4e00-\u9fff]+", "", cleaned).lower()
+    return NAME_NOISE_RE.sub("", cleaned).lower()
 
 
+@lru_cache(maxsize=128)
 def _normalize_author(value: Optional[str]) -> str:
     cleaned = _clean_text(value) or ""
-    return re.sub(r"[^0-9a-zA-Z\u4e00-\u9fff]+", "", cleaned).lower()
+    return NAME_NOISE_RE.sub("", cleaned).lower()
 
 
 def _author_word_set(value: Optional[str]) -> set[str]:
     cleaned = _clean_text(value) or ""
     if not cleaned:
         return set()
-    return {token.lower() for token in re.findall(r"[0-9a-zA-Z]+|[\u4e00-\u9fff]+", cleaned)}
+    return {token.lower() for token in AUTHOR_TOKEN_RE.findall(cleaned)}
 
 
 def _author_parts(value: Optional[str]) -> list[str]:
     cleaned = _clean_text(value) or ""
     if not cleaned:
         return []
-    parts = [part.strip() for part in re.split(r"\s*(?:/|,|，|;|；|&|＆|\||、)\s*", cleaned) if part.strip()]
+    parts = [part.strip() for part in AUTHOR_SPLIT_RE.split(cleaned) if part.strip()]
     return parts or [cleaned]
 
 
 def _title_match_score(result_title: Optional[str], query: str) -> int:
     target = _normalize_title(query)
+    return _score_title_against(target, frozenset(target), result_title)
+
+
+def _score_title_against(target: str, target_chars: frozenset[str], result_title: Optional[str]) -> int:
     if not target:
         return 0
     title = _normalize_title(result_title)
@@ -570,7 +646,7 @@ def _title_match_score(result_title: Optional[str], query: str) -> int:
         return 4
     if target in title or title in target:
         return 3
-    common = sum(1 for ch in set(target) if ch in set(title))
+    common = len(target_chars.intersection(title))
     return 2 if common >= max(2, min(len(target), len(title)) // 2) else 0
 
 
@@ -634,13 +710,17 @@ def _lookup_douban(query: str, timeout: float, author: Optional[str] = None) ->
         return None
 
     expected_author = _clean_text(author)
+    target = _normalize_title(query)
+    target_chars = frozenset(target)
+    # An exact title plus exact author (or exact title when no author is given) cannot be beaten.
+    top_rank = (1, 4, 8) if expected_author else (0, 4, 0)
     best_item: Optional[dict[str, Any]] = None
     best_rank: Optional[tuple[int, int, int]] = None
     saw_author_metadata = False
     for item in data:
         if not isinstance(item, dict):
             continue
-        title_score = _title_match_score(str(item.get("title") or ""), query)
+        title_score = _score_title_against(target, target_chars, str(item.get("title") or ""))
         author_score = 0
         if expected_author:
             author_name = _clean_text(str(item.get("author_name") or ""))
@@ -655,6 +735,8 @@ def _lookup_douban(query: str, timeout: float, author: Optional[str] = None) ->
         if best_rank is None or rank > best_rank:
             best_rank = rank
             best_item = item
+            if rank == top_rank:
+                break
     if not best_item:
         return None
     if expected_author and saw_author_metadata and best_rank is not None and best_rank[0] == 0:
@@ -671,8 +753,11 @@ def _lookup_douban(query: str, timeout: float, author: Optional[str] = None) ->
     subject_id = str(best_item.get("id") or "").strip()
     if subject_id:
         detail_url = f"https://book.douban.com/subject/{subject_id}/"
-        detail_html = _fetch_text(detail_url, timeout=timeout)
-        detail_meta = parse_douban_subject_html(detail_html)
+        detail_meta = _cached_lookup(detail_url)
+        if detail_meta is None:
+            detail_meta = parse_douban_subject_html(_fetch_text(detail_url, timeout=timeout))
+            if _has_metadata(detail_meta):
+                _store_lookup(detail_url, detail_meta)
         metadata = _merge_metadata(metadata, detail_meta)
     return metadata
 
@@ -681,9 +766,9 @@ def _lookup_amazon(query: str, timeout: float) -> Optional[LookupMetadata]:
     search_url = "https://www.amazon.com/s?k=" + urllib.parse.quote(query) + "&i=stripbooks"
     search_html = _fetch_text(search_url, timeout=timeout)
 
-    asin_match = re.search(r"/dp/([A-Z0-9]{10})", search_html)
+    asin_match = AMAZON_ASIN_PATH_RE.search(search_html)
     if not asin_match:
-        asin_match = re.search(r"data-asin=[\"']([A-Z0-9]{10})[\"']", search_html)
+        asin_match = AMAZON_ASIN_ATTR_RE.search(search_html)
     if not asin_match:
         return None
 
@@ -693,6 +778,22 @@ def _lookup_amazon(query: str, timeout: float) -> Optional[LookupMetadata]:
     return parse_amazon_product_html(detail_html)
 
 
+def _has_metadata(item: LookupMetadata) -> bool:
+    return any(
+        (
+            item.title,
+            item.author,
+            item.language,
+            item.description,
+            item.publisher,
+            item.tags,
+            item.published,
+            item.isbn,
+            item.cover_url,
+        )
+    )
+
+
 def _merge_metadata(primary: LookupMetadata, overlay: LookupMetadata) -> LookupMetadata:
     return LookupMetadata(
         source=primary.source or overlay.source,
@@ -701,7 +802,7 @@ def _merge_metadata(primary: LookupMetadata, overlay: LookupMetadata) -> LookupM
         language=overlay.language or primary.language,
         description=overlay.description or primary.description,
         publisher=overlay.publisher or primary.publisher,
-        tags=overlay.tags or primary.tags,
+        tags=list(overlay.tags or primary.tags),
         published=overlay.published or primary.published,
         isbn=overlay.isbn or primary.isbn,
         cover_url=overlay.cover_url or primary.cover_url,
@@ -20,6 +20,10 @@ TITLE_ONLY_RE = re.compile(r"^《(.+)》$")
 SENTENCE_END_RE = re.compile(r"[。！？]$")
 COMMA_RE = re.compile(r"[，,]")
 
+# Numbered backreferences and conditionals break once patterns are renumbered into one alternation.
+GROUP_REFERENCE_RE = re.compile(r"\\[1-9]|\(\?\(")
+LEADING_FLAGS_RE = re.compile(r"^\(\?([aiLmsux]+)\)")
+
 
 @dataclass(frozen=True)
 class RuleConfig:
@@ -42,6 +46,7 @@ class RuleSet:
     heading_max_len: int
     heading_max_commas: int
     skip_candidate_re: re.Pattern[str]
+    heading_re: Optional[re.Pattern[str]] = None
 
 
 @dataclass(frozen=True)
@@ -62,6 +67,35 @@ class ParsedBookSection:
 ParsedBookEvent = Union[ParsedBookHeader, ParsedBookSection]
 
 
+def _scoped_pattern(pattern: str) -> str:
+    # Leading global flags are only legal at the start of the whole expression.
+    match = LEADING_FLAGS_RE.match(pattern)
+    if match:
+        return f"(?{match.group(1)}:{pattern[match.end():]})"
+    return f"(?:{pattern})"
+
+
+def _build_heading_re(config: RuleConfig) -> Optional[re.Pattern[str]]:
+    # Alternation tries branches in order, so chapter > special > volume priority holds.
+    if any(GROUP_REFERENCE_RE.search(pattern) for pattern in (*config.chapter_patterns, *config.volume_patterns)):
+        return None
+    chapter_branches = [_scoped_pattern(pattern) for pattern in config.chapter_patterns]
+    if config.special_headings:
+        keywords = "|".join(re.escape(keyword) for keyword in config.special_headings)
+        chapter_branches.append(f"(?:{keywords})(?:[ ：:]|\\Z)")
+    branches: list[str] = []
+    if chapter_branches:
+        branches.append("(?P<chapter>" + "|".join(chapter_branches) + ")")
+    if config.volume_patterns:
+        branches.append("(?P<volume>" + "|".join(_scoped_pattern(pattern) for pattern in config.volume_patterns) + ")")
+    if not branches:
+        return None
+    try:
+        return re.compile("|".join(branches))
+    except re.error:
+        return None
+
+
 def build_rules(config: RuleConfig) -> RuleSet:
     chapter_patterns = [re.compile(pattern) for pattern in config.chapter_patterns]
     volume_patterns = [re.compile(pattern) for pattern in config.volume_patterns]
@@ -73,6 +107,7 @@ def build_rules(config: RuleConfig) -> RuleSet:
         heading_max_len=config.heading_max_len,
         heading_max_commas=config.heading_max_commas,
         skip_candidate_re=re.compile(config.skip_candidate_re),
+        heading_re=_build_heading_re(config),
     )
 
 
@@ -172,6 +207,11 @@ def classify_heading(
     s = line.strip()
     if not s:
         return None
+    if rules.heading_re is not None:
+        match = rules.heading_re.match(s)
+        if match is None:
+            return None
+        return match.lastgroup if is_likely_heading_line(line, prev_line, next_line, rules) else None
     for pattern in rules.chapter_patterns:
         if pattern.match(s):
             return "chapter" if is_likely_heading_line(line, prev_line, next_line, rules) else None
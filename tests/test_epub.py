@@ -1,6 +1,8 @@
+import io
 import tempfile
 import unittest
 from unittest.mock import patch
+from lxml import etree as LXML_ET
 from pathlib import Path
 import zipfile
 
@@ -15,6 +17,7 @@ from bindery.epub import (
     update_epub_metadata,
 )
 from bindery.epub import load_epub_item
+from bindery import epub as epub_module
 from bindery.models import Book, Chapter, Metadata
 
 
@@ -302,6 +305,43 @@ class BuildEpubTests(unittest.TestCase):
             "/book/abc/epub/OEBPS/Text/",
         )
 
+    def test_build_epub_parallel_deflate_matches_serial_output(self) -> None:
+        book = Book(title="测试书", author="作者", intro="简介")
+        for index in range(12):
+            chapter = Chapter(title=f"第{index + 1}章", lines=[f"第{index + 1}章的正文。"] * 20)
+            book.root_chapters.append(chapter)
+            book.spine.append(chapter)
+        meta = Metadata(
+            book_id="parallel-deflate-id",
+            title="测试书",
+            author="作者",
+            language="zh-CN",
+            description=None,
+            created_at="",
+            updated_at="",
+        )
+
+        def members(path: Path) -> dict[str, tuple[bytes, int, int]]:
+            with zipfile.ZipFile(path, "r") as zf:
+                self.assertIsNone(zf.testzip())
+                self.assertEqual(zf.namelist()[0], "mimetype")
+                return {
+                    info.filename: (zf.read(info), info.compress_type, info.external_attr)
+                    for info in zf.infolist()
+                    if info.filename.endswith(".xhtml") and "section_" in info.filename
+                }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            serial_path = Path(tmp) / "serial.epub"
+            parallel_path = Path(tmp) / "parallel.epub"
+            with patch("bindery.epub.BUILD_COMPRESS_WORKERS", 1):
+                build_epub(book, meta, serial_path)
+            with patch("bindery.epub.BUILD_COMPRESS_WORKERS", 3):
+                build_epub(book, meta, parallel_path)
+            serial = members(serial_path)
+            self.assertEqual(len(serial), 13)
+            self.assertEqual(members(parallel_path), serial)
+
     def test_build_epub_creates_file(self) -> None:
         book = Book(title="测试书", author="作者", intro=None)
         chapter = Chapter(title="第一章", lines=["第一段文字。"])
@@ -333,6 +373,10 @@ class BuildEpubTests(unittest.TestCase):
                 self.assertTrue(section_files)
                 content = zf.read(section_files[0]).decode("utf-8")
                 self.assertIn("第一章", content)
+                infos = zf.infolist()
+                self.assertEqual(infos[0].filename, "mimetype")
+                self.assertEqual(infos[0].compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(zf.getinfo(section_files[0]).compress_type, zipfile.ZIP_DEFLATED)
 
     def test_build_epub_from_section_stream_creates_file(self) -> None:
         meta = Metadata(
@@ -369,6 +413,51 @@ class BuildEpubTests(unittest.TestCase):
                 self.assertIn("EPUB/Text/section_0002.xhtml", names)
                 self.assertIn("第一章", zf.read("EPUB/Text/section_0001.xhtml").decode("utf-8"))
 
+    def test_build_epub_from_section_stream_writes_sections_without_temp_files(self) -> None:
+        meta = Metadata(
+            book_id="stream-direct-id",
+            title="直写书",
+            author="作者",
+            language="zh-CN",
+            description=None,
+            publisher=None,
+            tags=[],
+            published=None,
+            isbn=None,
+            rating=None,
+            created_at="",
+            updated_at="",
+        )
+
+        def stream():
+            for index in range(1, 4):
+                # Only the pending archive may sit next to the output mid-build.
+                pending = list(Path(tmp).iterdir())
+                self.assertEqual(len(pending), 1)
+                self.assertTrue(pending[0].is_file())
+                yield StreamBuildSection(kind="chapter", title=f"第{index}章", lines=[f"段落{index}"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "direct.epub"
+            build_epub_from_section_stream(
+                stream_sections=stream(),
+                source_author="作者",
+                source_intro="简介内容",
+                meta=meta,
+                output_path=output_path,
+            )
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], ["direct.epub"])
+            with zipfile.ZipFile(output_path, "r") as zf:
+                self.assertIsNone(zf.testzip())
+                infos = zf.infolist()
+                self.assertEqual(infos[0].filename, "mimetype")
+                self.assertEqual(infos[0].compress_type, zipfile.ZIP_STORED)
+                section_names = [info.filename for info in infos if info.filename.startswith("EPUB/Text/")]
+                self.assertEqual(section_names, [f"EPUB/Text/section_{i:04d}.xhtml" for i in range(1, 5)])
+                self.assertIn("第3章", zf.read("EPUB/Text/section_0004.xhtml").decode("utf-8"))
+                opf = zf.read("EPUB/content.opf").decode("utf-8")
+                self.assertIn("Text/section_0004.xhtml", opf)
+
     def test_build_epub_from_section_stream_filters_empty_lines(self) -> None:
         meta = Metadata(
             book_id="stream-empty-lines-id",
@@ -463,6 +552,34 @@ class BuildEpubTests(unittest.TestCase):
                 self.assertIn('class="chapter-stamp">第12章</p>', content)
                 self.assertIn('class="chapter-title">风雪夜归人</h1>', content)
 
+    def test_build_epub_escapes_markup_characters_in_text(self) -> None:
+        book = Book(title="猫&狗", author="作者", intro="简介 <一> & 二")
+        chapter = Chapter(title="第1章 A&B <C>", lines=["x < y & z"])
+        book.root_chapters.append(chapter)
+        book.spine.append(chapter)
+
+        meta = Metadata(
+            book_id="escape-id",
+            title="猫&狗",
+            author="甲&乙",
+            language="zh-CN",
+            description="描述 <b>",
+            tags=["科幻&奇幻"],
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            build_epub(book, meta, output_path)
+            with zipfile.ZipFile(output_path, "r") as zf:
+                for name in zf.namelist():
+                    if name.endswith((".xhtml", ".opf", ".ncx")):
+                        LXML_ET.fromstring(zf.read(name))
+                chapter_html = zf.read("EPUB/Text/section_0001.xhtml").decode("utf-8")
+                self.assertIn("<p>x &lt; y &amp; z</p>", chapter_html)
+                self.assertIn("A&amp;B &lt;C&gt;</h1>", chapter_html)
+
     def test_list_epub_sections_keeps_full_chapter_title_from_toc(self) -> None:
         book = Book(title="测试书", author="作者", intro=None)
         chapter = Chapter(title="第12章 风雪夜归人", lines=["第一段文字。"])
@@ -517,7 +634,8 @@ class BuildEpubTests(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmp:
             output_path = Path(tmp) / "book.epub"
             build_epub(book, meta, output_path)
-            extracted = extract_epub_metadata(output_path, "fallback")
+            with patch("bindery.epub._opf_bytes_from_zip", side_effect=AssertionError("unexpected full OPF read")):
+                extracted = extract_epub_metadata(output_path, "fallback")
             self.assertEqual(extracted["title"], "元数据书")
             self.assertEqual(extracted["author"], "作者")
             self.assertEqual(extracted["language"], "zh-CN")
@@ -592,6 +710,25 @@ class BuildEpubTests(unittest.TestCase):
             self.assertTrue(sections)
             self.assertTrue(sections[0].title)
 
+            titles = [section.title for section in sections]
+            hits = epub_module._epub_sections_cached.cache_info().hits
+            sections[0].title = "mutated"
+            self.assertEqual([section.title for section in list_epub_sections(output_path)], titles)
+            self.assertEqual(epub_module._epub_sections_cached.cache_info().hits, hits + 1)
+
+            book.root_chapters.append(Chapter(title="第二章", lines=["更多正文"]))
+            book.spine.append(book.root_chapters[-1])
+            build_epub(book, meta, output_path)
+            self.assertEqual([s.title for s in list_epub_sections(output_path)][-1], "第二章")
+
+            with patch("bindery.epub._opf_root_from_zip", wraps=epub_module._opf_root_from_zip) as opf_root:
+                for _ in range(2):
+                    documents = epub_module.list_epub_section_documents(output_path)
+                    self.assertEqual(documents[-1].title, "第二章")
+                    self.assertIn("更多正文", documents[-1].content.decode("utf-8"))
+                list_epub_sections(output_path)
+            self.assertEqual(opf_root.call_count, 0)
+
     def test_update_epub_metadata_repairs_noncanonical_nav_entry(self) -> None:
         book = Book(title="章节书", author="作者", intro="简介")
         chapter = Chapter(title="第一章", lines=["正文"])
@@ -750,6 +887,37 @@ class BuildEpubTests(unittest.TestCase):
                         linked += 1
                 self.assertGreater(linked, 0)
 
+    def test_update_epub_metadata_skips_document_patch_when_css_unchanged(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="css-digest-id")
+            meta = Metadata(
+                book_id="css-digest-id",
+                title="新书名",
+                author="旧作者",
+                language="zh-CN",
+                description=None,
+                created_at="",
+                updated_at="",
+            )
+
+            update_epub_metadata(output_path, meta, css_text="body{margin:0;}")
+            meta.title = "再改书名"
+            with patch(
+                "bindery.epub._patch_doc_html_bindery_css",
+                side_effect=AssertionError("documents should not be re-patched"),
+            ):
+                update_epub_metadata(output_path, meta, css_text="body{margin:0;}")
+
+            self.assertEqual(extract_epub_metadata(output_path, "fallback")["title"], "再改书名")
+            html_text = self._read_any_chapter_html(output_path)
+            self.assertEqual(html_text.count("bindery.css"), 1)
+
+            update_epub_metadata(output_path, meta, css_text="body{margin:1em;}")
+            with zipfile.ZipFile(output_path, "r") as zf:
+                css_name = next(name for name in zf.namelist() if name.endswith("/Styles/bindery.css"))
+                self.assertEqual(zf.read(css_name).decode("utf-8"), "body{margin:1em;}")
+
     def test_update_epub_metadata_places_bindery_css_under_styles_dir(self) -> None:
         meta = Metadata(
             book_id="update-css-dir-id",
@@ -829,6 +997,190 @@ class BuildEpubTests(unittest.TestCase):
                 self.assertFalse(any(name.endswith("/Styles/bindery.css") for name in names))
                 self.assertFalse(any(name.endswith("/Styles/bindery-overlay.css") for name in names))
 
+    def test_update_epub_metadata_without_cover_or_css_only_reads_opf(self) -> None:
+        new_meta = Metadata(
+            book_id="opf-only-id",
+            title="新书名",
+            author="新作者",
+            language="zh-CN",
+            description="新简介",
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="opf-only-id")
+            original_read = zipfile.ZipFile.read
+            read_names: list[str] = []
+
+            def tracking_read(zf, name, pwd=None):
+                read_names.append(name.filename if isinstance(name, zipfile.ZipInfo) else name)
+                return original_read(zf, name, pwd)
+
+            with patch.object(zipfile.ZipFile, "read", tracking_read):
+                update_epub_metadata(output_path, new_meta)
+
+            self.assertTrue(read_names)
+            self.assertTrue(all(name.endswith((".opf", ".xml")) or name == "mimetype" for name in read_names))
+            self.assertEqual(extract_epub_metadata(output_path, "opf-only-id")["title"], "新书名")
+            self.assertIn("<style>p{color:#d00;}</style>", self._read_any_chapter_html(output_path))
+
+    def test_update_epub_metadata_leaves_archive_untouched_when_metadata_matches(self) -> None:
+        new_meta = Metadata(
+            book_id="unchanged-meta-id",
+            title="新书名",
+            author="新作者",
+            language="zh-CN",
+            description="新简介",
+            created_at="",
+            updated_at="",
+            tags=["科幻"],
+            rating=4,
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="unchanged-meta-id")
+            update_epub_metadata(output_path, new_meta)
+            first = output_path.read_bytes()
+
+            update_epub_metadata(output_path, new_meta)
+            self.assertEqual(output_path.read_bytes(), first)
+
+            new_meta.title = "再改书名"
+            update_epub_metadata(output_path, new_meta)
+            self.assertEqual(extract_epub_metadata(output_path, "unchanged-meta-id")["title"], "再改书名")
+
+    def test_update_epub_metadata_failure_keeps_original_and_removes_temp(self) -> None:
+        new_meta = Metadata(
+            book_id="atomic-id",
+            title="新书名",
+            author="新作者",
+            language="zh-CN",
+            description="新简介",
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="atomic-id")
+            original = output_path.read_bytes()
+            with patch("bindery.epub._copy_zip_member_stream", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    update_epub_metadata(output_path, new_meta)
+
+            self.assertEqual(output_path.read_bytes(), original)
+            self.assertEqual(sorted(path.name for path in Path(tmp).iterdir()), ["book.epub"])
+
+    def test_update_epub_metadata_keeps_opf_namespace_prefixes(self) -> None:
+        new_meta = Metadata(
+            book_id="opf-prefix-id",
+            title="新书名",
+            author="新作者",
+            language="zh-CN",
+            description="新简介",
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="opf-prefix-id")
+            update_epub_metadata(output_path, new_meta, css_text="p{margin:0;}")
+            with zipfile.ZipFile(output_path, "r") as zf:
+                opf_text = zf.read("OEBPS/content.opf").decode("utf-8")
+
+            self.assertIn('<package xmlns="http://www.idpf.org/2007/opf"', opf_text)
+            self.assertIn("<dc:title>新书名</dc:title>", opf_text)
+            self.assertNotIn("ns0:", opf_text)
+
+    def test_update_epub_metadata_copies_untouched_members_without_recompressing(self) -> None:
+        book = Book(title="旧标题", author="旧作者", intro=None)
+        chapter = Chapter(title="第一章", lines=["正文"] * 200)
+        book.root_chapters.append(chapter)
+        book.spine.append(chapter)
+        meta = Metadata(
+            book_id="raw-copy-id",
+            title="旧标题",
+            author="旧作者",
+            language="zh-CN",
+            description=None,
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            build_epub(book, meta, output_path)
+            with zipfile.ZipFile(output_path, "r") as zf:
+                before = {info.filename: (info.CRC, info.compress_size) for info in zf.infolist()}
+                section_name = next(name for name in before if name.endswith("section_0001.xhtml"))
+                section_bytes = zf.read(section_name)
+
+            original_open = zipfile.ZipFile.open
+            opened: list[str] = []
+
+            def tracking_open(zf, name, *args, **kwargs):
+                opened.append(name.filename if isinstance(name, zipfile.ZipInfo) else name)
+                return original_open(zf, name, *args, **kwargs)
+
+            meta.title = "新标题"
+            with patch.object(zipfile.ZipFile, "open", tracking_open):
+                update_epub_metadata(output_path, meta)
+
+            self.assertFalse([name for name in opened if name.endswith(".xhtml")])
+            with zipfile.ZipFile(output_path, "r") as zf:
+                self.assertIsNone(zf.testzip())
+                info = zf.getinfo(section_name)
+                self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+                self.assertEqual((info.CRC, info.compress_size), before[section_name])
+                self.assertEqual(zf.read(section_name), section_bytes)
+                self.assertEqual(zf.namelist()[0], "mimetype")
+
+    def test_zipfile_internals_used_by_raw_writes_are_present(self) -> None:
+        # If this fails, a Python upgrade removed zipfile internals and raw copies silently fall back.
+        missing = [name for name in epub_module.ZIPFILE_PRIVATE_NAMES if not hasattr(zipfile, name)]
+        with zipfile.ZipFile(io.BytesIO(), "w") as probe:
+            missing += [name for name in epub_module.ZIPFILE_PRIVATE_ATTRS if not hasattr(probe, name)]
+        self.assertEqual(missing, [])
+        self.assertTrue(epub_module.ZIP_RAW_WRITES_SUPPORTED)
+
+    def test_update_epub_metadata_streams_members_without_zipfile_internals(self) -> None:
+        book = Book(title="旧标题", author="旧作者", intro=None)
+        chapter = Chapter(title="第一章", lines=["正文"] * 200)
+        book.root_chapters.append(chapter)
+        book.spine.append(chapter)
+        meta = Metadata(
+            book_id="stream-copy-id",
+            title="旧标题",
+            author="旧作者",
+            language="zh-CN",
+            description=None,
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            build_epub(book, meta, output_path)
+            with zipfile.ZipFile(output_path, "r") as zf:
+                section_name = next(name for name in zf.namelist() if name.endswith("section_0001.xhtml"))
+                section_bytes = zf.read(section_name)
+
+            meta.title = "新标题"
+            with (
+                patch("bindery.epub.ZIP_RAW_WRITES_SUPPORTED", False),
+                patch("bindery.epub._append_raw_zip_member", side_effect=AssertionError("raw write")),
+            ):
+                update_epub_metadata(output_path, meta)
+
+            with zipfile.ZipFile(output_path, "r") as zf:
+                self.assertIsNone(zf.testzip())
+                self.assertEqual(zf.read(section_name), section_bytes)
+                self.assertEqual(zf.namelist()[0], "mimetype")
+
     def test_update_epub_metadata_with_cover_preserves_inline_head_styles(self) -> None:
         new_meta = Metadata(
             book_id="cover-only-id",
@@ -853,6 +1205,91 @@ class BuildEpubTests(unittest.TestCase):
             with zipfile.ZipFile(output_path, "r") as zf:
                 names = zf.namelist()
                 self.assertTrue(any("cover" in Path(name).name.lower() for name in names))
+                cover_name = next(name for name in names if Path(name).name.lower() == "cover.jpg")
+                self.assertEqual(zf.read(cover_name), b"\xff\xd8\xff\xd9")
+                self.assertEqual(zf.getinfo(cover_name).compress_type, zipfile.ZIP_STORED)
+
+            with patch("bindery.epub._zip_member_index", side_effect=AssertionError("unexpected member index")):
+                extracted = epub_module.extract_cover(output_path)
+            self.assertIsNotNone(extracted)
+            self.assertEqual(extracted[0], b"\xff\xd8\xff\xd9")  # type: ignore[index]
+
+    def test_extract_cover_prefers_cover_image_property_over_named_image(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="cover-priority-id")
+            with zipfile.ZipFile(output_path, "r") as zf:
+                entries = [(info.filename, zf.read(info.filename)) for info in zf.infolist()]
+            with zipfile.ZipFile(output_path, "w") as zf:
+                for name, payload in entries:
+                    if name == "OEBPS/content.opf":
+                        payload = payload.replace(
+                            b"</manifest>",
+                            b"<item id=\"old-cover\" href=\"Images/old_cover.png\" media-type=\"image/png\"/>"
+                            b"<item id=\"art\" href=\"Images/front.png\" media-type=\"image/png\" properties=\"cover-image\"/>"
+                            b"</manifest>",
+                        )
+                    zf.writestr(name, payload)
+                zf.writestr("OEBPS/Images/old_cover.png", b"old")
+                zf.writestr("OEBPS/Images/front.png", b"front")
+
+            self.assertEqual(epub_module.extract_cover(output_path), (b"front", "OEBPS/Images/front.png"))
+
+    def test_extract_cover_shares_parsed_package_until_rewrite(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="cover-cache-id")
+            cover_path = Path(tmp) / "cover.jpg"
+            cover_path.write_bytes(b"\xff\xd8\xff\xd9")
+            update_epub_metadata(
+                output_path,
+                Metadata(
+                    book_id="cover-cache-id",
+                    title="书",
+                    author="作者",
+                    language="zh-CN",
+                    description=None,
+                    created_at="",
+                    updated_at="",
+                ),
+                cover_path=cover_path,
+            )
+
+            with patch("bindery.epub._opf_root_from_zip", wraps=epub_module._opf_root_from_zip) as opf_root:
+                first = epub_module.extract_cover(output_path)
+                self.assertEqual(epub_module.extract_cover(output_path), first)
+                list_epub_sections(output_path)
+            self.assertIsNotNone(first)
+            self.assertEqual(first[0], b"\xff\xd8\xff\xd9")
+            self.assertEqual(opf_root.call_count, 1)
+
+            cover_path.write_bytes(b"\xff\xd8\x00\xff\xd9")
+            update_epub_metadata(
+                output_path,
+                Metadata(
+                    book_id="cover-cache-id",
+                    title="书",
+                    author="作者",
+                    language="zh-CN",
+                    description=None,
+                    created_at="",
+                    updated_at="",
+                ),
+                cover_path=cover_path,
+            )
+            refreshed = epub_module.extract_cover(output_path)
+            self.assertIsNotNone(refreshed)
+            self.assertEqual(refreshed[0], b"\xff\xd8\x00\xff\xd9")
+
+    def test_extract_cover_without_package_returns_none(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            with zipfile.ZipFile(output_path, "w") as zf:
+                zf.writestr("mimetype", "application/epub+zip")
+            self.assertIsNone(epub_module.extract_cover(output_path))
+            output_path.write_bytes(b"not a zip")
+            with self.assertRaises(zipfile.BadZipFile):
+                epub_module.extract_cover(output_path)
 
     def test_update_epub_metadata_with_cover_and_css_appends_link_and_keeps_inline_style(self) -> None:
         new_meta = Metadata(
@@ -881,6 +1318,42 @@ class BuildEpubTests(unittest.TestCase):
                 css_name = next(name for name in names if name.endswith("/Styles/bindery.css"))
                 self.assertIn("font-size:18px", zf.read(css_name).decode("utf-8", errors="replace"))
 
+    def test_update_epub_metadata_css_rewrite_deflates_chapters_in_archive_order(self) -> None:
+        book = Book(title="章节书", author="作者", intro="简介")
+        for index in range(10):
+            chapter = Chapter(title=f"第{index + 1}章", lines=[f"第{index + 1}章正文。"] * 10)
+            book.root_chapters.append(chapter)
+            book.spine.append(chapter)
+        meta = Metadata(
+            book_id="css-parallel-id",
+            title="章节书",
+            author="作者",
+            language="zh-CN",
+            description=None,
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            results = []
+            for workers in (1, 3):
+                output_path = Path(tmp) / f"book-{workers}.epub"
+                build_epub(book, meta, output_path)
+                with patch("bindery.epub.BUILD_COMPRESS_WORKERS", workers):
+                    update_epub_metadata(output_path, meta, css_text="p{margin:0;}")
+                with zipfile.ZipFile(output_path, "r") as zf:
+                    self.assertIsNone(zf.testzip())
+                    results.append(
+                        [
+                            (info.filename, zf.read(info), info.compress_type)
+                            for info in zf.infolist()
+                            if "section_" in info.filename
+                        ]
+                    )
+            self.assertEqual(len(results[0]), 11)
+            self.assertTrue(all(b"bindery.css" in payload for _, payload, _ in results[0]))
+            self.assertEqual(results[1], results[0])
+
     def test_update_epub_metadata_can_strip_original_css(self) -> None:
         new_meta = Metadata(
             book_id="strip-original-css-id",
@@ -987,6 +1460,286 @@ class BuildEpubTests(unittest.TestCase):
             self.assertEqual(media_type, "text/html; charset=utf-8")
             self.assertIn("正文", content.decode("utf-8", errors="replace"))
 
+    def test_load_epub_item_reuses_manifest_media_types_for_unknown_extension(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            self._create_external_epub_with_inline_style(output_path, book_id="manifest-media-id")
+            with zipfile.ZipFile(output_path, "r") as zf:
+                entries = [(info.filename, zf.read(info.filename)) for info in zf.infolist()]
+            with zipfile.ZipFile(output_path, "w") as zf:
+                for name, payload in entries:
+                    if name == "OEBPS/content.opf":
+                        payload = payload.replace(
+                            b"</manifest>",
+                            b"<item id=\"f1\" href=\"Fonts/body.ttf\" media-type=\"font/ttf\"/></manifest>",
+                        )
+                    zf.writestr(name, payload)
+                zf.writestr("OEBPS/Fonts/body.ttf", b"\x00\x01\x00\x00")
+
+            epub_module._manifest_media_types_cached.cache_clear()
+            with patch("bindery.epub._opf_root_from_zip", wraps=epub_module._opf_root_from_zip) as opf_root:
+                for _ in range(3):
+                    content, media_type = load_epub_item(output_path, "OEBPS/Fonts/body.ttf", "/book/x/epub/")
+                    self.assertEqual(media_type, "font/ttf")
+                    self.assertEqual(content, b"\x00\x01\x00\x00")
+            self.assertEqual(opf_root.call_count, 1)
+
+    def test_load_epub_item_reuses_open_archive_until_file_changes(self) -> None:
+        book = Book(title="旧标题", author="旧作者", intro=None)
+        chapter = Chapter(title="第一章", lines=["正文"])
+        book.root_chapters.append(chapter)
+        book.spine.append(chapter)
+        meta = Metadata(
+            book_id="preview-pool-id",
+            title="旧标题",
+            author="旧作者",
+            language="zh-CN",
+            description=None,
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            build_epub(book, meta, output_path)
+            with patch("bindery.epub.zipfile.ZipFile", wraps=zipfile.ZipFile) as opened:
+                for _ in range(3):
+                    content, _ = load_epub_item(output_path, "section_0001.xhtml", "/b/")
+                    self.assertIn("正文", content.decode("utf-8"))
+            self.assertEqual(opened.call_count, 1)
+
+            old_keys = [key for key in epub_module._preview_readers if key[0] == str(output_path)]
+            self.assertEqual(len(old_keys), 1)
+            old_reader = epub_module._preview_readers[old_keys[0]]
+
+            chapter.lines = ["改写后的正文"]
+            build_epub(book, meta, output_path)
+            content, _ = load_epub_item(output_path, "section_0001.xhtml", "/b/")
+            self.assertIn("改写后的正文", content.decode("utf-8"))
+            # The reader for the replaced archive is closed, not left to LRU eviction.
+            self.assertIsNone(old_reader.zf.fp)
+            self.assertEqual(len([key for key in epub_module._preview_readers if key[0] == str(output_path)]), 1)
+
+            output_path.unlink()
+            with self.assertRaises(FileNotFoundError):
+                load_epub_item(output_path, "section_0001.xhtml", "/b/")
+            self.assertFalse([key for key in epub_module._preview_readers if key[0] == str(output_path)])
+
+    def test_read_preview_member_does_not_hold_the_pool_lock_while_reading(self) -> None:
+        book = Book(title="书", author=None, intro=None)
+        chapter = Chapter(title="第一章", lines=["正文"])
+        book.root_chapters.append(chapter)
+        book.spine.append(chapter)
+        meta = Metadata(
+            book_id="preview-lock-id",
+            title="书",
+            author=None,
+            language="zh-CN",
+            description=None,
+            created_at="",
+            updated_at="",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            build_epub(book, meta, output_path)
+            load_epub_item(output_path, "section_0001.xhtml", "/b/")
+            lock_states: list[bool] = []
+            original_read = zipfile.ZipFile.read
+
+            def read(zf: zipfile.ZipFile, name: str) -> bytes:
+                lock_states.append(epub_module._preview_readers_lock.locked())
+                return original_read(zf, name)
+
+            with patch.object(zipfile.ZipFile, "read", read):
+                load_epub_item(output_path, "section_0001.xhtml", "/b/")
+            self.assertEqual(lock_states, [False])
+            self.assertTrue(any(key[0] == str(output_path) for key in epub_module._preview_readers))
+            epub_module._discard_preview_readers(str(output_path))
+
+    def test_extract_title_from_html_prefers_title_then_headings(self) -> None:
+        extract = epub_module._extract_title_from_html
+        self.assertEqual(extract("<h1>A</h1><title>X &amp; Y</title>"), "X & Y")
+        self.assertEqual(extract("<title> </title><h2>C</h2><h1 class='x'><span>B</span></h1>"), "B")
+        self.assertEqual(extract("<h1><h2>C</h2><title>T</title></h2>"), "T")
+        self.assertEqual(extract("<h1></h1><H2>D</h2>"), "D")
+        self.assertIsNone(extract("<title>unclosed<p>text</p>"))
+
+    def test_spine_document_items_skip_nav_and_fall_back_to_manifest(self) -> None:
+        def package(spine: str) -> LXML_ET._Element:
+            return LXML_ET.fromstring(
+                '<package xmlns="http://www.idpf.org/2007/opf"><manifest>'
+                '<item id="nav" href="Text/NAV.XHTML" media-type="Application/XHTML+XML"/>'
+                '<item id="toc" href="toc.xhtml" media-type="application/xhtml+xml" properties="nav"/>'
+                '<item id="css" href="style.css" media-type="text/css"/>'
+                '<item id="c1" href="Text/c1.xhtml" media-type="application/xhtml+xml"/>'
+                '<item id="c2" href="Text/c2.html" media-type="text/html"/>'
+                f"</manifest><spine>{spine}</spine></package>".encode("utf-8")
+            )
+
+        root = package('<itemref idref="c2"/><itemref idref="nav"/><itemref idref="css"/><itemref idref="gone"/>')
+        items, by_id = epub_module._manifest_from_opf("OEBPS/content.opf", root)
+        self.assertEqual(
+            [item.member_path for item in epub_module._spine_document_items(root, items, by_id)],
+            ["OEBPS/Text/c2.html"],
+        )
+        root = package("")
+        items, by_id = epub_module._manifest_from_opf("OEBPS/content.opf", root)
+        self.assertEqual(
+            [item.member_path for item in epub_module._spine_document_items(root, items, by_id)],
+            ["OEBPS/Text/c1.xhtml", "OEBPS/Text/c2.html"],
+        )
+
+    def test_member_name_helpers_match_pathlib(self) -> None:
+        for name in ("Text/c1.xhtml", "c1", "Text/.hidden", "a/.x.y", "a..b", "dir/name.", "Text/", "x.tar.gz"):
+            self.assertEqual(epub_module._member_stem(name), Path(name).stem, name)
+        self.assertEqual(epub_module._guess_media_type("OEBPS/Images/A.PNG"), "image/png")
+        self.assertEqual(epub_module._guess_media_type("OEBPS/v1.0/README"), "application/octet-stream")
+        self.assertEqual(epub_module._guess_image_media_type("cover.webp.JPG"), "image/jpeg")
+
+    def test_looks_like_isbn_counts_isbn_characters(self) -> None:
+        self.assertTrue(epub_module._looks_like_isbn("978-7-02-000220-7"))
+        self.assertTrue(epub_module._looks_like_isbn("ISBN 7-02-000220-X"))
+        self.assertFalse(epub_module._looks_like_isbn("urn:uuid:0f8fad5b-d9cb-469f-a165-70867728950e"))
+        self.assertFalse(epub_module._looks_like_isbn("12345678901"))
+        self.assertFalse(epub_module._looks_like_isbn(""))
+
+    def test_append_stylesheet_link_handles_head_shapes(self) -> None:
+        link = '<link rel="stylesheet" type="text/css" href="../Styles/bindery.css" />'
+        cases = (
+            ("<html><head><title>t</title></head><body/></html>", f"<html><head><title>t</title>{link}</head><body/></html>"),
+            ('<html><head class="x" /><body/></html>', f'<html><head class="x" >{link}</head><body/></html>'),
+            ("<html><HEAD>\n<title>t</title></HEAD></html>", f"<html><HEAD>\n<title>t</title>{link}</HEAD></html>"),
+            ("<html><head><title>t</title><body/></html>", f"<html><head>{link}<title>t</title><body/></html>"),
+            ("<html><body><header/></body></html>", f"<head>{link}</head><html><body><header/></body></html>"),
+        )
+        for source, expected in cases:
+            self.assertEqual(epub_module._append_stylesheet_link(source, "../Styles/bindery.css"), expected)
+
+    def test_path_lookup_keys_are_unique_and_ordered(self) -> None:
+        self.assertEqual(
+            epub_module._path_lookup_keys("EPUB/Text/c1.xhtml"), ["EPUB/Text/c1.xhtml", "Text/c1.xhtml", "c1.xhtml"]
+        )
+        self.assertEqual(epub_module._path_lookup_keys("EPUB/c1.xhtml"), ["EPUB/c1.xhtml", "c1.xhtml"])
+        self.assertEqual(epub_module._path_lookup_keys("./c1.xhtml"), ["c1.xhtml"])
+        self.assertEqual(epub_module._path_lookup_keys(""), [])
+
+    def test_strip_bindery_css_links_only_drops_overlay_links(self) -> None:
+        html_text = (
+            "<head><link rel=\"stylesheet\" href=\"../Styles/style.css\"/>"
+            "<LINK href='../Styles/Bindery.css?v=2' rel='stylesheet'/>\n  "
+            "<link rel=\"stylesheet\" href=\"bindery-overlay.css\" /></head>"
+        )
+        self.assertEqual(
+            epub_module._strip_bindery_css_links(html_text),
+            "<head><link rel=\"stylesheet\" href=\"../Styles/style.css\"/></head>",
+        )
+        unclosed = "<link href='bindery.css' " * 50
+        self.assertEqual(epub_module._strip_bindery_css_links(unclosed), unclosed)
+
+    def test_opf_path_from_container_scans_and_falls_back_to_parser(self) -> None:
+        cases = {
+            "<container><rootfiles><rootfile media-type='x' full-path='./OPS/book.opf'/></rootfiles></container>": "OPS/book.opf",
+            (
+                "<container xmlns=\"urn:oasis:names:tc:opendocument:xmlns:container\"><rootfiles>"
+                "<rootfile full-path=\"R&amp;D/content.opf\"/></rootfiles></container>"
+            ): "R&D/content.opf",
+        }
+        for container_xml, expected in cases.items():
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as zf:
+                zf.writestr("META-INF/container.xml", container_xml)
+            with zipfile.ZipFile(buffer, "r") as zf:
+                self.assertEqual(epub_module._opf_path_from_container(zf), expected)
+
+    def test_preview_helpers_strip_scripts_and_replace_base(self) -> None:
+        html_text = (
+            '<html><head><base href="../../" /><title>t</title>'
+            '<script src="a.js"/><SCRIPT type="text/javascript">alert(1)</SCRIPT></head>'
+            "<body><header>h</header><p>x</p></body></html>"
+        )
+        prepared = epub_module._prepare_preview_html(html_text.encode("utf-8"), "/book/x/epub/")
+        self.assertEqual(
+            prepared,
+            b'<html><head><base href="/book/x/epub/" /><title>t</title></head>'
+            b"<body><header>h</header><p>x</p></body></html>",
+        )
+        self.assertEqual(
+            epub_module._prepare_preview_html(b"<html><head/><body><header/></body></html>", "/b/"),
+            b'<html><head><base href="/b/" /></head><body><header/></body></html>',
+        )
+
+    def test_strip_preview_tags_survives_unclosed_scripts(self) -> None:
+        html_text = (
+            "<html><head><BASE href='../'>\n<script src=a.js/></head><body>"
+            + "<p>x<script>y</p>" * 2000
+            + "<base href=x></body></html>"
+        )
+        stripped = epub_module._strip_preview_tags(html_text.encode("utf-8"))
+        self.assertEqual(stripped, b"<html><head></head><body>" + b"<p>x<script>y</p>" * 2000 + b"</body></html>")
+        self.assertEqual(stripped.count(b"<script>"), 2000)
+        self.assertEqual(
+            epub_module._strip_preview_tags(b"a<script>b</script ><script x>c</SCRIPT>d<script"),
+            b"ad<script",
+        )
+        plain = "<p>正文</p>".encode("utf-8")
+        self.assertIs(epub_module._strip_preview_tags(plain), plain)
+
+    def test_inject_base_bytes_handles_head_shapes(self) -> None:
+        cases = (
+            (
+                b"<html><head><title>t</title></head><body><header>x</header></body></html>",
+                b'<html><head><base href="/book/x/epub/" /><title>t</title></head><body><header>x</header></body></html>',
+            ),
+            (
+                b'<html><HEAD lang="zh">\n<title>t</title></HEAD></html>',
+                b'<html><HEAD lang="zh"><base href="/book/x/epub/" />\n<title>t</title></HEAD></html>',
+            ),
+            (
+                b"<html><head/><body/></html>",
+                b'<html><head><base href="/book/x/epub/" /></head><body/></html>',
+            ),
+            (
+                b'<html><head class="a" /><body/></html>',
+                b'<html><head class="a" ><base href="/book/x/epub/" /></head><body/></html>',
+            ),
+            (
+                b"<html><body><header/></body></html>",
+                b'<head><base href="/book/x/epub/" /></head><html><body><header/></body></html>',
+            ),
+        )
+        for content, expected in cases:
+            self.assertEqual(epub_module._inject_base_bytes(content, "/book/x/epub/"), expected, content)
+
+    def test_prepare_preview_html_keeps_undecodable_bytes(self) -> None:
+        content = b"<html><head><script>x</script></head><body><p>\xb2\xe2\xca\xd4</p></body></html>"
+        self.assertEqual(
+            epub_module._prepare_preview_html(content, "/b/"),
+            b'<html><head><base href="/b/" /></head><body><p>\xb2\xe2\xca\xd4</p></body></html>',
+        )
+
+    def test_load_epub_item_labels_declared_chapter_charset(self) -> None:
+        gbk_chapter = '<?xml version="1.0" encoding="GBK"?><html><head></head><body><p>测试</p></body></html>'.encode("gbk")
+        utf16_chapter = "<html><head></head><body><p>测试</p></body></html>".encode("utf-16")
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "book.epub"
+            with zipfile.ZipFile(output_path, "w") as zf:
+                zf.writestr("gbk.xhtml", gbk_chapter)
+                zf.writestr("utf16.xhtml", utf16_chapter)
+                zf.writestr("plain.xhtml", "<html><head></head><body>正文</body></html>")
+
+            content, media_type = load_epub_item(output_path, "gbk.xhtml", "/b/")
+            self.assertEqual(media_type, "text/html; charset=gbk")
+            self.assertIn("测试".encode("gbk"), content)
+
+            content, media_type = load_epub_item(output_path, "utf16.xhtml", "/b/")
+            self.assertEqual(media_type, "text/html; charset=utf-8")
+            self.assertIn('<base href="/b/" />'.encode("utf-8"), content)
+            self.assertIn("测试", content.decode("utf-8"))
+
+            _, media_type = load_epub_item(output_path, "plain.xhtml", "/b/")
+            self.assertEqual(media_type, "text/html; charset=utf-8")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,10 @@
+import gzip
 import unittest
+import zlib
+from email.message import Message
 from unittest.mock import patch
 
+from bindery import metadata_lookup
 from bindery.metadata_lookup import (
     LookupMetadata,
     lookup_book_metadata_verbose,
@@ -31,7 +35,9 @@ class MetadataLookupTests(unittest.TestCase):
           </head>
         </html>
         """
-        metadata = parse_douban_subject_html(html)
+        with patch("bindery.metadata_lookup._clean_text", wraps=metadata_lookup._clean_text) as clean:
+            metadata = parse_douban_subject_html(html)
+        self.assertNotIn(html, [call.args[0] for call in clean.call_args_list])
         self.assertEqual(metadata.source, "douban")
         self.assertEqual(metadata.title, "The Three-Body Problem")
         self.assertEqual(metadata.author, "Cixin Liu")
@@ -124,6 +130,18 @@ class MetadataLookupTests(unittest.TestCase):
             "https://img3.doubanio.com/view/subject/l/public/s7654321.jpg",
         )
 
+    def test_extract_douban_cover_href_checks_class_tokens(self) -> None:
+        html = """
+        <a class="tag" href="https://book.douban.com/tag/nbg">nbg</a>
+        <a class="nbgx" href="https://img1.doubanio.com/wrong.jpg">x</a>
+        <a href="https://img2.doubanio.com/right.jpg"
+           class="cover NBG">cover</a>
+        """
+        self.assertEqual(
+            metadata_lookup._extract_douban_cover_href(html),
+            "https://img2.doubanio.com/right.jpg",
+        )
+
     def test_parse_douban_subject_html_falls_back_to_og_image(self) -> None:
         html = """
         <html>
@@ -154,6 +172,170 @@ class MetadataLookupTests(unittest.TestCase):
         metadata = parse_douban_subject_html(html)
         self.assertEqual(metadata.publisher, "Random House Children's Books")
 
+    def test_parse_douban_subject_html_reads_escaped_ld_json(self) -> None:
+        html = """
+        <html>
+          <head>
+            <script TYPE="Application/LD+JSON">{"@type": "Book", "name": "Tom &amp; Jerry"}</script>
+            <script type="application/ld+json">{&quot;@type&quot;: &quot;Book&quot;}</script>
+          </head>
+        </html>
+        """
+        document = metadata_lookup._parse_html(html)
+        self.assertEqual(
+            list(metadata_lookup._iter_ld_json_objects(document)),
+            [{"@type": "Book", "name": "Tom &amp; Jerry"}, {"@type": "Book"}],
+        )
+        self.assertEqual(parse_douban_subject_html(html).title, "Tom & Jerry")
+
+    def test_parse_douban_subject_html_stops_at_first_book_ld_json(self) -> None:
+        html = """
+        <html>
+          <head>
+            <script type="application/ld+json">{"@type": "WebSite", "name": "豆瓣"}</script>
+            <script type="application/ld+json">{"@type": "Book", "name": "三体", "isbn": "9787536692930"}</script>
+            <script type="application/ld+json">{"@type": "BreadcrumbList"}</script>
+          </head>
+        </html>
+        """
+        with patch("bindery.metadata_lookup.json.loads", wraps=metadata_lookup.json.loads) as loads:
+            metadata = parse_douban_subject_html(html)
+        self.assertEqual(metadata.title, "三体")
+        self.assertEqual(loads.call_count, 2)
+
+    def test_clean_text_strips_markup_and_collapses_whitespace(self) -> None:
+        clean = metadata_lookup._clean_text
+        self.assertEqual(clean("  刘慈欣 "), "刘慈欣")
+        self.assertEqual(clean("<b>Tom</b>&amp;\n\tJerry"), "Tom & Jerry")
+        self.assertEqual(clean("a &lt;br&gt; b"), "a b")
+        self.assertEqual(clean("\u3000全角\u3000空格\xa0"), "全角 空格")
+        self.assertIsNone(clean(" <p> </p> "))
+        self.assertIsNone(clean(""))
+
+    def test_tag_extractors_dedupe_in_order(self) -> None:
+        self.assertEqual(metadata_lookup._split_tags("科幻, 小说，科幻 / ; 硬科幻"), ["科幻", "小说", "硬科幻"])
+        self.assertEqual(metadata_lookup._split_tags(" "), [])
+        html = "criteria = '7:小说| 7:文学 |3:/subject/1/|17:旧|7:小说|7: |7:&amp;A';"
+        self.assertEqual(metadata_lookup._extract_douban_criteria_tags(html), ["小说", "文学", "&A"])
+
+    def test_html_fragment_to_markdownish_rewrites_tags(self) -> None:
+        convert = metadata_lookup._html_fragment_to_markdownish
+        raw = '<div class="intro"><ul><li class="x">一</li><LI>二</li></ul>\n <p>甲 \t<br/>  乙</p>\r\n<span>a&amp;b</span></div>'
+        self.assertEqual(convert(raw), "- 一\n\n- 二\n\n甲\n乙\n\na&b")
+        self.assertIsNone(convert("<div> <br> </div>"))
+        self.assertIsNone(convert(""))
+
+    def test_title_match_score_reuses_normalized_query(self) -> None:
+        score = metadata_lookup._title_match_score
+        metadata_lookup._normalize_title.cache_clear()
+        self.assertEqual(score("三体", "《三体》"), 4)
+        self.assertEqual(score("三体II：黑暗森林", "三体"), 3)
+        self.assertEqual(score("体三者", "三体"), 2)
+        self.assertEqual(score("球状闪电", "三体"), 0)
+        self.assertEqual(score(None, "三体"), 0)
+        self.assertGreaterEqual(metadata_lookup._normalize_title.cache_info().hits, 4)
+
+    def test_parse_douban_subject_html_parses_page_once(self) -> None:
+        html = """
+        <html>
+          <body>
+            <div id="link-report"><div class="intro"><p>简介。</p></div></div>
+            <a class="nbg" href="https://img3.doubanio.com/view/subject/l/public/s7654321.jpg">cover</a>
+          </body>
+        </html>
+        """
+        with patch("bindery.metadata_lookup.lxml_html.fromstring", wraps=metadata_lookup.lxml_html.fromstring) as parse:
+            metadata = parse_douban_subject_html(html)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(metadata.description, "简介。")
+
+    def test_fetch_helpers_decode_compressed_bodies(self) -> None:
+        metadata_lookup._fetch_cache.clear()
+        self.addCleanup(metadata_lookup._fetch_cache.clear)
+        def respond(encoding: str) -> Message:
+            headers = Message()
+            headers["Content-Type"] = "text/html; charset=utf-8"
+            if encoding:
+                headers["Content-Encoding"] = encoding
+            return headers
+
+        cases = [
+            (gzip.compress("三体".encode("utf-8")), "gzip"),
+            (zlib.compress("三体".encode("utf-8")), "deflate"),
+            (zlib.compress("三体".encode("utf-8"))[2:-4], "deflate"),
+            ("三体".encode("utf-8"), ""),
+        ]
+        for body, encoding in cases:
+            with patch("bindery.metadata_lookup.urllib.request.urlopen") as mocked_urlopen:
+                response = mocked_urlopen.return_value.__enter__.return_value
+                response.read.return_value = body
+                response.headers = respond(encoding)
+                self.assertEqual(metadata_lookup._fetch_text("https://book.douban.com/"), "三体")
+                request_obj = mocked_urlopen.call_args.args[0]
+                self.assertEqual(request_obj.get_header("Accept-encoding"), "gzip, deflate")
+
+        with patch("bindery.metadata_lookup.urllib.request.urlopen") as mocked_urlopen:
+            response = mocked_urlopen.return_value.__enter__.return_value
+            response.read.return_value = gzip.compress(b'[{"title": "x"}]')
+            response.headers = respond("gzip")
+            self.assertEqual(metadata_lookup._fetch_json("https://book.douban.com/j"), [{"title": "x"}])
+
+    def test_fetch_json_caches_only_parsed_payloads(self) -> None:
+        metadata_lookup._fetch_cache.clear()
+        self.addCleanup(metadata_lookup._fetch_cache.clear)
+        url = "https://book.douban.com/j/subject_suggest?q=x"
+        with (
+            patch(
+                "bindery.metadata_lookup._fetch",
+                side_effect=["<html>captcha</html>", '[{"id": "1"}]', '[{"id": "2"}]'],
+            ) as fetch,
+            patch("bindery.metadata_lookup.time.monotonic", side_effect=[0.0, 1.0, 2.0, 10.0, 400.0, 401.0]),
+        ):
+            with self.assertRaises(ValueError):
+                metadata_lookup._fetch_json(url)
+            self.assertEqual(metadata_lookup._fetch_json(url), [{"id": "1"}])
+            self.assertEqual(metadata_lookup._fetch_json(url), [{"id": "1"}])
+            self.assertEqual(metadata_lookup._fetch_json(url), [{"id": "2"}])
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_lookup_douban_caches_only_detail_pages_with_metadata(self) -> None:
+        metadata_lookup._fetch_cache.clear()
+        self.addCleanup(metadata_lookup._fetch_cache.clear)
+        suggest_payload = [{"id": "9", "title": "三体"}]
+        detail_html = '<script type="application/ld+json">{"@type": "Book", "name": "三体", "isbn": "9787536692930"}</script>'
+        with (
+            patch("bindery.metadata_lookup._fetch_json", return_value=suggest_payload),
+            patch(
+                "bindery.metadata_lookup._fetch_text",
+                side_effect=["<html>验证码</html>", detail_html, AssertionError("cached page refetched")],
+            ) as fetch_text,
+        ):
+            first = metadata_lookup._lookup_douban("三体", 8.0)
+            second = metadata_lookup._lookup_douban("三体", 8.0)
+            third = metadata_lookup._lookup_douban("三体", 8.0)
+        assert first is not None and second is not None and third is not None
+        self.assertIsNone(first.isbn)
+        self.assertEqual(second.isbn, "9787536692930")
+        self.assertEqual(third.isbn, "9787536692930")
+        self.assertEqual(fetch_text.call_count, 2)
+
+    def test_fetch_text_caps_body_size(self) -> None:
+        metadata_lookup._fetch_cache.clear()
+        self.addCleanup(metadata_lookup._fetch_cache.clear)
+        headers = Message()
+        headers["Content-Type"] = "text/html; charset=utf-8"
+        headers["Content-Encoding"] = "gzip"
+        with (
+            patch.object(metadata_lookup, "MAX_FETCH_BYTES", 1024),
+            patch("bindery.metadata_lookup.urllib.request.urlopen") as mocked_urlopen,
+        ):
+            response = mocked_urlopen.return_value.__enter__.return_value
+            response.read.return_value = gzip.compress(b"a" * 100_000)
+            response.headers = headers
+            text = metadata_lookup._fetch_text("https://book.douban.com/")
+        response.read.assert_called_once_with(1024)
+        self.assertEqual(text, "a" * 1024)
+
     def test_parse_amazon_product_html_from_ld_json(self) -> None:
         html = """
         <html>
@@ -221,7 +403,9 @@ class MetadataLookupTests(unittest.TestCase):
           </body>
         </html>
         """
-        metadata = parse_amazon_product_html(html)
+        with patch("bindery.metadata_lookup._clean_text", wraps=metadata_lookup._clean_text) as clean:
+            metadata = parse_amazon_product_html(html)
+        self.assertNotIn(html, [call.args[0] for call in clean.call_args_list])
         self.assertEqual(metadata.title, "Pirates Past Noon (Magic Tree House, No. 4)")
         self.assertEqual(metadata.author, "Mary Pope Osborne, Sal Murdocca")
         self.assertEqual(metadata.publisher, "Random House Children's Books")
@@ -230,6 +414,23 @@ class MetadataLookupTests(unittest.TestCase):
         self.assertEqual(metadata.isbn, "978-0679824251")
         self.assertIn("Magic Tree House", metadata.description or "")
 
+    def test_amazon_extractors_skip_pages_without_their_blocks(self) -> None:
+        html = '<meta name="title" content="Amazon.com: Dune: 9780441172719: Herbert, Frank: Books" />'
+        self.assertEqual(metadata_lookup._extract_amazon_product_title(html), "Dune")
+        self.assertIsNone(metadata_lookup._extract_amazon_byline_authors(html))
+        html = '<DIV ID="bylineInfo"><A href="/a">Frank Herbert</A></DIV>'
+        self.assertEqual(metadata_lookup._extract_amazon_byline_authors(html), "Frank Herbert")
+
+    def test_extract_amazon_rpi_value_reads_from_the_keyed_block(self) -> None:
+        html = """
+        <div class="rpi-attribute-value"><span>wrong</span></div>
+        <DIV data-a="1"
+             id='rpi-attribute-book_details-language'><div class="rpi-attribute-label">Language</div>
+          <div class="rpi-attribute-value"> <span>English</span></div></DIV>
+        """
+        self.assertEqual(metadata_lookup._extract_amazon_rpi_value(html, "book_details-language"), "English")
+        self.assertIsNone(metadata_lookup._extract_amazon_rpi_value(html, "book_details-isbn10"))
+
     def test_lookup_verbose_uses_douban_only(self) -> None:
         with (
             patch(
@@ -281,6 +482,7 @@ class MetadataLookupTests(unittest.TestCase):
         self.assertEqual(douban_attempt["error"], "blocked")
 
     def test_lookup_verbose_prefers_matching_author_for_same_title(self) -> None:
+        self.addCleanup(metadata_lookup._fetch_cache.clear)
         suggest_payload = [
             {"id": "1", "title": "三体", "author_name": "张三", "year": "2001"},
             {"id": "2", "title": "三体", "author_name": "刘慈欣", "year": "2008"},
@@ -323,6 +525,24 @@ class MetadataLookupTests(unittest.TestCase):
         self.assertTrue(attempts[0]["selected"])
         self.assertEqual(attempts[0]["source"], "douban")
 
+    def test_lookup_douban_stops_at_unbeatable_candidate(self) -> None:
+        suggest_payload = [
+            {"id": "1", "title": "三体II", "author_name": "刘慈欣"},
+            {"id": "2", "title": "《三体》", "author_name": "刘慈欣"},
+            {"id": "3", "title": "三体", "author_name": "刘慈欣"},
+        ]
+        with (
+            patch("bindery.metadata_lookup._fetch_json", return_value=suggest_payload),
+            patch("bindery.metadata_lookup._fetch_text", return_value="<html></html>"),
+            patch(
+                "bindery.metadata_lookup._score_title_against", wraps=metadata_lookup._score_title_against
+            ) as score,
+        ):
+            best = metadata_lookup._lookup_douban("三体", 8.0, author="刘慈欣")
+        assert best is not None
+        self.assertEqual(best.title, "《三体》")
+        self.assertEqual(score.call_count, 2)
+
     def test_lookup_verbose_rejects_same_title_with_mismatched_author(self) -> None:
         suggest_payload = [
             {"id": "1", "title": "三体", "author_name": "张三", "year": "2001"},
@@ -3,7 +3,18 @@ from pathlib import Path
 import tempfile
 
 from bindery.models import book_from_dict, book_to_dict
-from bindery.parsing import ParsedBookHeader, ParsedBookSection, parse_book, parse_book_file, parse_book_file_events, text_file_has_content
+from bindery.parsing import (
+    DEFAULT_RULES,
+    ParsedBookHeader,
+    ParsedBookSection,
+    RuleConfig,
+    build_rules,
+    classify_heading,
+    parse_book,
+    parse_book_file,
+    parse_book_file_events,
+    text_file_has_content,
+)
 
 
 class ParseBookTests(unittest.TestCase):
@@ -102,6 +113,46 @@ class ParseBookTests(unittest.TestCase):
         self.assertEqual(sections[0].lines, ["第一段"])
         self.assertEqual(sections[1].title, "第2章 继续")
 
+    def test_classify_heading_with_combined_rules(self) -> None:
+        self.assertIsNotNone(DEFAULT_RULES.heading_re)
+        self.assertEqual(classify_heading("第三章 风起"), "chapter")
+        self.assertEqual(classify_heading("CHAPTER 7 Storm"), "chapter")
+        self.assertEqual(classify_heading("番外篇：旧事"), "chapter")
+        self.assertEqual(classify_heading("序"), "chapter")
+        self.assertIsNone(classify_heading("序幕拉开"))
+        self.assertEqual(classify_heading("第二卷 远行"), "volume")
+        self.assertIsNone(classify_heading("第三章里他说了很多话，然后走了，没有回头。", "上文", "下文"))
+
+        rules = build_rules(
+            RuleConfig(
+                rule_id="custom",
+                name="custom",
+                chapter_patterns=[r"(?x) ^ PART \s+ \d+", r"^(第|卷)\d+话"],
+                volume_patterns=[r"^卷\d+$"],
+                special_headings=["尾声"],
+            )
+        )
+        self.assertIsNotNone(rules.heading_re)
+        self.assertEqual(classify_heading("PART 2", rules=rules), "chapter")
+        self.assertEqual(classify_heading("卷3话 重逢", rules=rules), "chapter")
+        self.assertEqual(classify_heading("卷3", rules=rules), "volume")
+        self.assertEqual(classify_heading("尾声 ", rules=rules), "chapter")
+        self.assertIsNone(classify_heading("part 2", rules=rules))
+
+    def test_classify_heading_falls_back_for_backreferences(self) -> None:
+        rules = build_rules(
+            RuleConfig(
+                rule_id="backref",
+                name="backref",
+                chapter_patterns=[r"^(\d)\1章"],
+                volume_patterns=[],
+                special_headings=[],
+            )
+        )
+        self.assertIsNone(rules.heading_re)
+        self.assertEqual(classify_heading("11章 双", rules=rules), "chapter")
+        self.assertIsNone(classify_heading("12章 单", rules=rules))
+
 
 if __name__ == "__main__":
     unittest.main()